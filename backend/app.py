@@ -4,37 +4,85 @@ Main application file for the house price prediction API
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
+import redis.asyncio as aioredis
 from config import (
     API_TITLE, 
     API_DESCRIPTION, 
     API_VERSION, 
     API_HOST, 
     API_PORT,
+    API_WORKERS,
+    API_MAX_INFLIGHT,
+    REDIS_URL,
     CORS_ORIGINS,
     CORS_ALLOW_CREDENTIALS,
     CORS_ALLOW_METHODS,
     CORS_ALLOW_HEADERS
 )
-from routes_module.dependencies import models
+from logging_setup import setup_logging
+from routes_module.dependencies import models, predictors, predict_pool
 from routes_module.routes import api_router
+from routes_module.routes.health import celery_health_pinger
+from celery_config import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+def _load_and_warm(model_type: str, model) -> None:
+    """Load a saved model and run one dry-run prediction to warm it up"""
+    try:
+        model.load_model()
+    except FileNotFoundError:
+        logger.info("No existing %s model found. Train it first.", model_type)
+        return
+    
+    logger.info("%s model loaded successfully", model_type.upper())
+    
+    # All-default features; pays the first-call graph tracing/compilation
+    # cost here instead of on the first real request. A failed warm-up must
+    # not block startup; the model is still served (and fails per request)
+    try:
+        model.predict({})
+    except Exception:
+        logger.exception("Warm-up prediction failed for %s model", model_type)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler for startup/shutdown"""
-    # Startup: Load models if available
-    for model_type, model in models.items():
-        try:
-            model.load_model()
-            print(f"{model_type.upper()} model loaded successfully")
-        except FileNotFoundError:
-            print(f"No existing {model_type} model found. Train it first.")
+    # Startup: log through a queue so handlers never block on stdout
+    setup_logging()
+    
+    # Startup: async Redis client for reading task state without blocking the loop
+    app.state.redis = aioredis.Redis.from_url(REDIS_URL, decode_responses=False, max_connections=100)
+    
+    # Startup: one broker producer held for the app's lifetime, so task
+    # submissions skip the per-call connection checkout
+    app.state.celery_producer = celery_app.producer_pool.acquire(block=True)
+    
+    # Background Celery worker ping; /celery/health serves its latest result
+    celery_pinger = asyncio.create_task(celery_health_pinger())
+    
+    # Load and warm up available models concurrently, off the event loop
+    await asyncio.gather(*(
+        asyncio.to_thread(_load_and_warm, model_type, model)
+        for model_type, model in models.items()
+    ))
     
     yield  # Application runs here
     
-    # Shutdown: cleanup code here if needed
+    # Shutdown: stop the health pinger, prediction batchers and thread pool
+    celery_pinger.cancel()
+    for predictor in predictors.values():
+        await predictor.stop()
+    predict_pool.shutdown(wait=False)
+    app.state.celery_producer.release()
+    await app.state.redis.aclose()
 
 
 # Create FastAPI app
@@ -54,6 +102,9 @@ app.add_middleware(
     allow_headers=CORS_ALLOW_HEADERS,
 )
 
+# Compress larger JSON responses (model status, comparisons, training metrics)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include all API routes
 app.include_router(api_router)
 
@@ -61,7 +112,7 @@ app.include_router(api_router)
 if __name__ == '__main__':
     import uvicorn
     
-    print(f"\nStarting Multi-Model FastAPI server on port {API_PORT}...")
+    print(f"\nStarting Multi-Model FastAPI server on port {API_PORT} with {API_WORKERS} worker(s)...")
     print(f"API endpoints:")
     print(f"  - GET  /health              - Health check")
     print(f"  - GET  /celery/health       - Celery worker health check")
@@ -70,11 +121,27 @@ if __name__ == '__main__':
     print(f"  - POST /train/{{model_type}} - Train model (synchronous)")
     print(f"  - POST /train/{{model_type}}/async - Train model (async with Celery)")
     print(f"  - GET  /task/{{task_id}}/status - Get async task status")
+    print(f"  - GET  /task/{{task_id}}/stream - Stream async task progress (SSE)")
     print(f"  - GET  /task/{{task_id}}/result - Get async task result")
+    print(f"  - GET  /task/group/{{group_id}}/status - Get per-model status of async 'all' training")
     print(f"  - POST /predict             - Predict with routing")
     print(f"  - POST /predict/compare     - Compare all models")
+    print(f"  - POST /predict/debug       - Show the LangGraph routing decision")
     print(f"  - GET  /docs                - Interactive API docs")
     print()
     
-    uvicorn.run(app, host=API_HOST, port=API_PORT)
+    # Multiple workers require the app as an import string
+    uvicorn.run(
+        "app:app",
+        host=API_HOST,
+        port=API_PORT,
+        workers=API_WORKERS,
+        loop="asyncio" if os.name == "nt" else "uvloop",  # uvloop has no Windows support
+        http="httptools",
+        log_level="info",
+        access_log=False,
+        limit_concurrency=API_MAX_INFLIGHT,
+        backlog=2048,
+        timeout_keep_alive=5
+    )
 
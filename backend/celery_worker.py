@@ -2,32 +2,142 @@
 Celery tasks for asynchronous model training
 Implements training tasks with progress tracking and status updates
 """
-from celery import Task
+from celery import Task, chord, group
+from celery.signals import worker_process_init
 from celery_config import celery_app
+from config import REDIS_URL, PROGRESS_CHANNEL_TEMPLATE, AVAILABLE_MODEL_TYPES
 from services.training_service import HousePriceModel
+from functools import lru_cache
+import logging
+import orjson
+import redis
 import traceback
 
+logger = logging.getLogger(__name__)
+
+# Client for pushing progress to subscribers (connections are opened lazily)
+progress_redis = redis.Redis.from_url(REDIS_URL)
+
+
+@lru_cache(maxsize=None)
+def get_model(model_type: str) -> HousePriceModel:
+    """Return this worker process's HousePriceModel for model_type"""
+    return HousePriceModel(model_type=model_type)
+
+
+@worker_process_init.connect
+def warm_model_cache(**kwargs):
+    """
+    Build the model wrappers when a worker child starts, not on its first task
+    
+    Also imports the ML frameworks and runs a trivial op in each, so their
+    import and kernel initialization cost is paid at fork time instead of by
+    the first training task after every child recycle.
+    """
+    import tensorflow as tf
+    import torch
+    import xgboost  # noqa: F401
+    
+    tf.constant(0.0)
+    torch.zeros(1)
+    if torch.cuda.is_available():
+        torch.cuda.init()
+    
+    for model_type in AVAILABLE_MODEL_TYPES:
+        get_model(model_type)
+
 
 class ProgressTrackingTask(Task):
     """Base task class with progress tracking capabilities"""
     
+    # Last (task id, percent, message) written to the result backend
+    _last_progress = None
+    
+    def publish_progress(self, state, meta=None):
+        """Push a progress event to the task's Pub/Sub channel"""
+        channel = PROGRESS_CHANNEL_TEMPLATE.format(task_id=self.request.id)
+        event = {'task_id': self.request.id, 'state': state, 'progress': meta}
+        try:
+            progress_redis.publish(channel, orjson.dumps(event))
+        except redis.RedisError as e:
+            # Streaming is best-effort; the result backend still has the state
+            logger.warning("Failed to publish progress for %s: %s", self.request.id, e)
+    
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        """Tell stream subscribers the task has finished"""
+        if status in ('SUCCESS', 'FAILURE'):
+            self.publish_progress(status)
+    
+    def make_epoch_callback(self, model_type, step_percent=5):
+        """
+        Build a progress_cb for model training that reports epoch progress
+        
+        Only every step_percent of progress (and the final epoch) is written,
+        so per-epoch callbacks don't flood the result backend.
+        """
+        last_percent = -step_percent
+        
+        def progress_cb(current, total):
+            nonlocal last_percent
+            percent = int((current / total) * 100) if total > 0 else 0
+            if percent - last_percent < step_percent and current < total:
+                return
+            last_percent = percent
+            self.update_progress(
+                current=current,
+                total=total,
+                message=f'Training {model_type.upper()} model: epoch {current}/{total}'
+            )
+        
+        return progress_cb
+    
     def update_progress(self, current, total, message=""):
-        """Update task progress"""
+        """Update task progress, skipping updates that would not change the stored state"""
         percent = int((current / total) * 100) if total > 0 else 0
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': current,
-                'total': total,
-                'percent': percent,
-                'message': message
-            }
-        )
+        progress_key = (self.request.id, percent, message)
+        if progress_key == self._last_progress:
+            return
+        self._last_progress = progress_key
+        
+        meta = {
+            'current': current,
+            'total': total,
+            'percent': percent,
+            'message': message
+        }
+        self.update_state(state='PROGRESS', meta=meta)
+        self.publish_progress('PROGRESS', meta)
 
 
-@celery_app.task(bind=True, base=ProgressTrackingTask, name='celery_worker.train_model_async')
-def train_model_async(self, model_type: str, epochs: int = 500, 
-                      learning_rate: float = 0.001, 
+def build_train_all_workflow(epochs: int = 500, learning_rate: float = 0.001,
+                             hidden_sizes: list = None):
+    """
+    Build the chord that trains every model type concurrently
+    
+    Each model is trained by its own train_single_model task so the three
+    trainings can run on different workers; finalize_all merges their results
+    into the same payload the sequential implementation used to return.
+    
+    Args:
+        epochs: Number of training epochs
+        learning_rate: Learning rate for optimizer
+        hidden_sizes: Hidden layer sizes
+    
+    Returns:
+        Celery chord signature (call apply_async() to dispatch it)
+    """
+    header = group(
+        train_single_model.s(mt, epochs, learning_rate, hidden_sizes)
+        for mt in AVAILABLE_MODEL_TYPES
+    )
+    return chord(header, finalize_all.s())
+
+
+# Redelivered if the worker process dies mid-run (e.g. OOM-killed), not just on a clean crash
+@celery_app.task(bind=True, base=ProgressTrackingTask, name='celery_worker.train_model_async',
+                 acks_late=True, reject_on_worker_lost=True)
+def train_model_async(self, model_type: str, epochs: int = 500,
+                      learning_rate: float = 0.001,
                       hidden_sizes: list = None):
     """
     Asynchronous model training task with progress tracking
@@ -37,78 +147,54 @@ def train_model_async(self, model_type: str, epochs: int = 500,
         epochs: Number of training epochs
         learning_rate: Learning rate for optimizer
         hidden_sizes: Hidden layer sizes
-        
+    
     Returns:
         Dictionary with training results and metrics
     """
     if hidden_sizes is None:
         hidden_sizes = [64, 32, 16]
     
+    if model_type == 'all':
+        # Fan out to one task per model; the chord result is delivered under
+        # this task's id, so callers polling it still get the merged payload
+        raise self.replace(build_train_all_workflow(epochs, learning_rate, hidden_sizes))
+    
     try:
         # Update state to STARTED
         self.update_state(state='STARTED', meta={'message': 'Initializing training...'})
         
-        if model_type == 'all':
-            # Train all models
-            model_types = ['tensorflow', 'pytorch', 'xgboost']
-            total_models = len(model_types)
-            results = {}
-            
-            for idx, mt in enumerate(model_types):
-                self.update_progress(
-                    current=idx,
-                    total=total_models,
-                    message=f'Training {mt.upper()} model ({idx + 1}/{total_models})...'
-                )
-                
-                model = HousePriceModel(model_type=mt)
-                metrics = model.train_model(
-                    epochs=epochs,
-                    learning_rate=learning_rate,
-                    hidden_sizes=hidden_sizes
-                )
-                results[mt] = metrics
-            
-            # Don't update to 100% - let Celery handle SUCCESS state
-            
-            return {
-                'success': True,
-                'message': 'All models trained successfully',
-                'model_type': 'all',
-                'results': results
-            }
-        else:
-            # Train specific model
-            self.update_progress(
-                current=0,
-                total=epochs,
-                message=f'Starting {model_type.upper()} model training...'
-            )
-            
-            model = HousePriceModel(model_type=model_type)
-            
-            # Train the model
-            self.update_progress(
-                current=0,
-                total=epochs,
-                message=f'Training {model_type.upper()} model...'
-            )
-            
-            metrics = model.train_model(
-                epochs=epochs,
-                learning_rate=learning_rate,
-                hidden_sizes=hidden_sizes
-            )
-            
-            # Don't update progress to 100% - let Celery set SUCCESS state automatically
-            # when the function returns successfully
-            
-            return {
-                'success': True,
-                'message': f'{model_type.upper()} model trained successfully',
-                'model_type': model_type,
-                'metrics': metrics
-            }
+        # Train specific model
+        self.update_progress(
+            current=0,
+            total=epochs,
+            message=f'Starting {model_type.upper()} model training...'
+        )
+        
+        model = get_model(model_type)
+        
+        # Train the model
+        self.update_progress(
+            current=0,
+            total=epochs,
+            message=f'Training {model_type.upper()} model...'
+        )
+        
+        metrics = model.train_model(
+            epochs=epochs,
+            learning_rate=learning_rate,
+            hidden_sizes=hidden_sizes,
+            progress_cb=self.make_epoch_callback(model_type)
+        )
+        
+        # Don't update progress to 100% - let Celery set SUCCESS state automatically
+        # when the function returns successfully
+        
+        return {
+            'success': True,
+            'message': f'{model_type.upper()} model trained successfully',
+            'model_type': model_type,
+            'metrics': metrics
+        }
     
     except Exception as e:
         # Capture error details
@@ -126,8 +212,110 @@ def train_model_async(self, model_type: str, epochs: int = 500,
         raise Exception(f"Training failed: {error_message}")
 
 
+@celery_app.task(bind=True, base=ProgressTrackingTask, name='celery_worker.train_single_model',
+                 acks_late=True, reject_on_worker_lost=True)
+def train_single_model(self, model_type: str, epochs: int = 500,
+                       learning_rate: float = 0.001,
+                       hidden_sizes: list = None):
+    """
+    Train one model as part of a "train all" chord
+    
+    Args:
+        model_type: Type of model to train ('tensorflow', 'pytorch', 'xgboost')
+        epochs: Number of training epochs
+        learning_rate: Learning rate for optimizer
+        hidden_sizes: Hidden layer sizes
+    
+    Returns:
+        Dictionary mapping the model type to its training metrics
+    """
+    if hidden_sizes is None:
+        hidden_sizes = [64, 32, 16]
+    
+    self.update_progress(
+        current=0,
+        total=epochs,
+        message=f'Training {model_type.upper()} model...'
+    )
+    
+    model = get_model(model_type)
+    metrics = model.train_model(
+        epochs=epochs,
+        learning_rate=learning_rate,
+        hidden_sizes=hidden_sizes,
+        progress_cb=self.make_epoch_callback(model_type)
+    )
+    
+    return {model_type: metrics}
+
+
+@celery_app.task(base=ProgressTrackingTask, name='celery_worker.finalize_all')
+def finalize_all(partial_results: list):
+    """
+    Merge the per-model results of a "train all" chord
+    
+    Args:
+        partial_results: List of {model_type: metrics} dictionaries
+    
+    Returns:
+        Dictionary with training results for all models
+    """
+    results = {}
+    for partial in partial_results:
+        results.update(partial)
+    
+    return {
+        'success': True,
+        'message': 'All models trained successfully',
+        'model_type': 'all',
+        'results': results
+    }
+
+
+def enqueue_bulk(signatures) -> list:
+    """
+    Submit many task signatures through a single broker producer
+    
+    Avoids checking a connection out of the pool for every apply_async
+    when fanning out many predictions or hyperparameter trainings.
+    
+    Args:
+        signatures: Iterable of Celery signatures
+    
+    Returns:
+        List of AsyncResult objects, in submission order
+    """
+    with celery_app.producer_pool.acquire(block=True) as producer:
+        return [sig.apply_async(producer=producer) for sig in signatures]
+
+
+def bulk_result_status(task_ids: list) -> dict:
+    """
+    Fetch the state of many tasks with a single MGET on the result backend
+    
+    Args:
+        task_ids: List of task ids
+    
+    Returns:
+        Dictionary mapping task id to {'state': ..., 'result': ...}
+    """
+    backend = celery_app.backend
+    keys = [backend.get_key_for_task(task_id) for task_id in task_ids]
+    values = backend.mget(keys) if keys else []
+    
+    statuses = {}
+    for task_id, value in zip(task_ids, values):
+        if value is None:
+            # Nothing stored yet: the task is unknown or still queued
+            statuses[task_id] = {'state': 'PENDING', 'result': None}
+        else:
+            meta = backend.decode_result(value)
+            statuses[task_id] = {'state': meta['status'], 'result': meta.get('result')}
+    
+    return statuses
+
+
 @celery_app.task(name='celery_worker.health_check')
 def health_check():
     """Simple health check task to verify Celery worker is running"""
     return {'status': 'healthy', 'message': 'Celery worker is operational'}
-
@@ -12,6 +12,20 @@ AVAILABLE_MODEL_TYPES: List[str] = ['tensorflow', 'pytorch', 'xgboost']
 # Server configuration
 API_PORT = int(os.environ.get('PORT', 5000))
 API_HOST = "0.0.0.0"
+# Uvicorn worker processes. Defaults to 1: each worker holds its own copy of
+# every model (TF, PyTorch, XGBoost), and synchronous /train only updates the
+# worker that handled it, so extra workers would keep serving stale models
+API_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+# Max concurrent connections per worker before uvicorn answers 503
+API_MAX_INFLIGHT = int(os.environ.get('MAX_INFLIGHT', 64))
+# Threads used to run blocking model predictions off the event loop
+PREDICT_WORKERS = int(os.environ.get('PREDICT_WORKERS', 4))
+# Micro-batching of concurrent predictions per model
+PREDICT_MAX_BATCH = int(os.environ.get('PREDICT_MAX_BATCH', 64))
+PREDICT_MAX_WAIT_MS = float(os.environ.get('PREDICT_MAX_WAIT_MS', 10))
+
+# Root log level; training details are logged at DEBUG
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
 
 # CORS configuration
 CORS_ORIGINS = ["*"]
@@ -21,11 +35,44 @@ CORS_ALLOW_HEADERS = ["*"]
 
 # Redis/Celery configuration
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+# Pub/Sub channel that task progress updates are pushed to
+PROGRESS_CHANNEL_TEMPLATE = 'progress:{task_id}'
+# Key mapping a "train all" chord callback task to the group of per-model tasks it waits on
+TASK_GROUP_KEY_TEMPLATE = 'task-group:{task_id}'
+# Seconds an async training submission is remembered; identical submissions within it reuse the task
+TRAIN_DEDUP_TTL = 3600
+# Seconds a submission's claim lives before its task ids are stored (bounds 409s if submission dies)
+TRAIN_DEDUP_CLAIM_TTL = 10
+# Seconds between background Celery worker pings, and age after which the last result is reported stale
+CELERY_HEALTH_INTERVAL = 10.0
+CELERY_HEALTH_STALE_AFTER = 15.0
 
 # File paths
 TRAINED_MODELS_DIR = 'backend/trained_models'
 MODEL_PATH_TEMPLATE = f'{TRAINED_MODELS_DIR}/model_{{model_type}}'
 SCALER_PATH_TEMPLATE = f'{TRAINED_MODELS_DIR}/scalers_{{model_type}}.pkl'
+# Saved model file extensions; the first is what save() writes, the rest are older formats load() still reads
+MODEL_FILE_EXTENSIONS = {
+    'tensorflow': ('.keras',),
+    'pytorch': ('.pt',),
+    'xgboost': ('.ubj', '.json'),
+}
+# Candidate saved model files per model type, in MODEL_FILE_EXTENSIONS order
+MODEL_FILE_PATHS = {
+    model_type: tuple(MODEL_PATH_TEMPLATE.format(model_type=model_type) + ext for ext in extensions)
+    for model_type, extensions in MODEL_FILE_EXTENSIONS.items()
+}
+# Seconds a "is this model trained" file check is reused before checking the disk again
+TRAINED_CHECK_TTL = 5.0
+
+# XGBoost threads per process; lower it when several Celery children share the cores
+XGBOOST_N_JOBS = int(os.environ.get('XGBOOST_N_JOBS', -1))
+# PyTorch intra-op / inter-op threads per process
+TORCH_THREADS = int(os.environ.get('TORCH_THREADS', min(8, os.cpu_count() or 1)))
+TORCH_INTEROP_THREADS = int(os.environ.get('TORCH_INTEROP_THREADS', 2))
+
+# Model input columns, in the order the models were trained on
+FEATURE_ORDER = ('MedInc', 'HouseAge', 'AveRooms', 'AveBedrms', 'Population', 'AveOccup', 'Latitude', 'Longitude')
 
 # Model training defaults
 DEFAULT_EPOCHS = 500
@@ -34,16 +81,31 @@ DEFAULT_HIDDEN_SIZES = [64, 32, 16]
 
 # Celery configuration
 CELERY_CONFIG = {
-    'task_serializer': 'json',
-    'accept_content': ['json'],
-    'result_serializer': 'json',
+    'task_serializer': 'orjson',  # Registered in celery_config
+    'accept_content': ['orjson', 'json'],
+    'result_serializer': 'orjson',
     'timezone': 'UTC',
     'enable_utc': True,
     'task_track_started': True,
     'task_time_limit': 3600,  # 1 hour max
     'task_soft_time_limit': 3300,  # 55 minutes soft limit
-    'worker_prefetch_multiplier': 1,
-    'worker_max_tasks_per_child': 10,
+    'worker_prefetch_multiplier': 1,  # Override per fleet with --prefetch-multiplier
+    # Long-running training goes to its own queue so short tasks are not stuck behind it
+    'task_default_queue': 'default',
+    'task_routes': {
+        'celery_worker.train_model_async': {'queue': 'training'},
+        'celery_worker.train_single_model': {'queue': 'training'},
+        'celery_worker.finalize_all': {'queue': 'default'},
+        'celery_worker.health_check': {'queue': 'default'},
+    },
+    'broker_pool_limit': 100,  # Sized for the high-concurrency gevent fleet
+    'task_acks_late': True,  # Redeliver training tasks if a worker crashes mid-run
+    # visibility_timeout must exceed task_time_limit, or Redis redelivers still-running
+    # late-ack tasks; keepalive holds the API's long-lived producer connection open
+    'broker_transport_options': {'visibility_timeout': 2 * 3600, 'socket_keepalive': True},
+    # Recycle children rarely (framework imports are expensive) and on memory growth
+    'worker_max_tasks_per_child': int(os.environ.get('CELERY_MAX_TASKS_PER_CHILD', 200)),
+    'worker_max_memory_per_child': int(os.environ.get('CELERY_MAX_MEM_KB', 2_000_000)),  # KB
     'result_expires': 3600,  # Results expire after 1 hour
     'result_extended': True,  # Store more task metadata
 }
@@ -0,0 +1,33 @@
+"""
+Logging configuration
+Log calls only enqueue the record; a background listener thread does the
+formatting and the blocking write to stdout, so request handlers never wait on I/O
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from config import LOG_LEVEL
+
+_listener = None
+
+
+def setup_logging() -> None:
+    """Route root-logger records through a queue to a background stdout writer (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+    
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush queued records on interpreter exit
+    atexit.register(_listener.stop)
@@ -6,7 +6,7 @@ This package contains three implementations:
 - PyTorch model  
 - Hugging Face Transformer model
 """
-from .base_model import BaseHousingModel, calculate_r2_score
+from .base_model import BaseHousingModel, R2Scorer, calculate_r2_score, to_f32
 
-__all__ = ['BaseHousingModel', 'calculate_r2_score']
+__all__ = ['BaseHousingModel', 'R2Scorer', 'calculate_r2_score', 'to_f32']
 
@@ -3,7 +3,8 @@ Abstract base class for house price prediction models
 Ensures consistent interface across TensorFlow, PyTorch, and Hugging Face implementations
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List
+import contextlib
+from typing import Callable, Dict, List, Optional
 import numpy as np
 
 
@@ -35,7 +36,8 @@ class BaseHousingModel(ABC):
     
     @abstractmethod
     def train(self, X: np.ndarray, y: np.ndarray, epochs: int = 500, 
-              batch_size: int = 32, verbose: bool = True) -> List[float]:
+              batch_size: int = 32, verbose: bool = True,
+              progress_cb: Optional[Callable[[int, int], None]] = None) -> List[float]:
         """
         Train the model
         
@@ -45,6 +47,8 @@ class BaseHousingModel(ABC):
             epochs: Number of training epochs
             batch_size: Batch size for training
             verbose: Whether to print progress
+            progress_cb: Optional callback called as progress_cb(epoch, epochs)
+                after each completed epoch
             
         Returns:
             List of losses per epoch
@@ -91,6 +95,19 @@ class BaseHousingModel(ABC):
         """
         pass
     
+    def thread_limit(self, n_threads: Optional[int]):
+        """
+        Context manager capping the threads train() uses inside it
+        
+        Used when several models train concurrently in one process. The
+        default does nothing (TensorFlow's thread pools are fixed once its
+        runtime has started).
+        
+        Args:
+            n_threads: Maximum threads, or None to leave the framework default
+        """
+        return contextlib.nullcontext()
+    
     def get_metrics(self) -> Dict:
         """
         Get model metrics
@@ -116,6 +133,43 @@ class BaseHousingModel(ABC):
         }
 
 
+class R2Scorer:
+    """
+    R² scorer for a fixed set of true values
+    
+    The total sum of squares depends only on y_true, so it is computed once
+    here; each score() call then needs a single pass over the predictions.
+    Use it when scoring the same validation set repeatedly (e.g. per epoch).
+    """
+    
+    def __init__(self, y_true: np.ndarray):
+        """
+        Initialize the scorer
+        
+        Args:
+            y_true: True values
+        """
+        self.y_true = np.ravel(y_true).astype(np.float64, copy=False)
+        # Centered two-pass sum in float64; the one-pass sum(y²) - (sum y)² / n
+        # cancels catastrophically when the mean is large relative to the spread
+        centered = self.y_true - self.y_true.mean()
+        self.ss_tot = float(np.dot(centered, centered))
+    
+    def score(self, y_pred: np.ndarray) -> float:
+        """
+        Calculate R² for the given predictions
+        
+        Args:
+            y_pred: Predicted values
+        
+        Returns:
+            R² score (1.0 is perfect, 0.0 is baseline, negative is worse than baseline)
+        """
+        residuals = self.y_true - np.ravel(y_pred)
+        # np.dot fuses the square-and-sum into one BLAS pass
+        return 1 - float(np.dot(residuals, residuals)) / self.ss_tot
+
+
 def calculate_r2_score(y_true: np.ndarray, y_pred: np.ndarray) -> float:
     """
     Calculate R² (coefficient of determination) score
@@ -127,7 +181,20 @@ def calculate_r2_score(y_true: np.ndarray, y_pred: np.ndarray) -> float:
     Returns:
         R² score (1.0 is perfect, 0.0 is baseline, negative is worse than baseline)
     """
-    ss_res = np.sum((y_true - y_pred) ** 2)
-    ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)
-    return 1 - (ss_res / ss_tot)
+    return R2Scorer(y_true).score(y_pred)
+
 
+def to_f32(array: np.ndarray) -> np.ndarray:
+    """
+    Return array as C-contiguous float32, copying only if it isn't already
+    
+    All frameworks here compute in float32; converting once at the model
+    boundary avoids hidden dtype/stride copies inside each framework.
+    
+    Args:
+        array: Input array (e.g. float64 features or labels)
+    
+    Returns:
+        C-contiguous float32 array
+    """
+    return np.ascontiguousarray(array, dtype=np.float32)
@@ -1,82 +1,350 @@
 import requests
-import json
+import aiohttp
+import asyncio
+import orjson
+import os
+import struct
+from functools import lru_cache
+from typing import List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+TRITON_URL = "https://nvidia-triton-inference.ccrolabs.com/v2/models/llama31-8b/infer"
+TRITON_GRPC_URL = os.environ.get("TRITON_GRPC_URL", "nvidia-triton-inference.ccrolabs.com:8001")
+TRITON_MODEL_NAME = "llama31-8b"
+
+# Send query_triton_llm over gRPC instead of HTTP when TRITON_USE_GRPC=1
+TRITON_USE_GRPC = os.environ.get("TRITON_USE_GRPC", "0") == "1"
+
+# Shared session so keep-alive reuses the TCP/TLS connection across calls
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+))
+
+# Shared gRPC client (persistent HTTP/2 channel), created on first use
+_GRPC_CLIENT = None
+
+# Shared aiohttp session for async callers, created on first use in the running loop
+_ASYNC_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+def _get_async_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use"""
+    global _ASYNC_SESSION
+    if _ASYNC_SESSION is None or _ASYNC_SESSION.closed:
+        _ASYNC_SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300)
+        )
+    return _ASYNC_SESSION
+
+
+# Inputs sent in the binary tail, in order: (name, datatype, struct format code)
+_BINARY_INPUTS = (
+    ("max_output_len", "INT64", "q"),
+    ("temperature", "FP32", "f"),
+    ("top_p", "FP32", "f"),
+    ("output_context_logits", "BOOL", "?"),
+    ("output_generation_logits", "BOOL", "?"),
+)
+
+
+@lru_cache(maxsize=64)
+def _header_suffix(n: int) -> bytes:
+    """Serialized descriptors of the binary inputs for a batch of n, closing the JSON header"""
+    specs = [
+        orjson.dumps({
+            "name": name,
+            "shape": [n, 1],
+            "datatype": datatype,
+            "parameters": {"binary_data_size": struct.calcsize(f"<{n}{code}")}
+        })
+        for name, datatype, code in _BINARY_INPUTS
+    ]
+    return b"," + b",".join(specs) + b"]}"
+
+
+@lru_cache(maxsize=64)
+def _tail_struct(n: int) -> struct.Struct:
+    """Precompiled packer for the binary tail of a batch of n"""
+    return struct.Struct("<" + "".join(f"{n}{code}" for _, _, code in _BINARY_INPUTS))
+
+
+def _build_request(prompts: List[str], max_tokens: int, temperature: float, top_p: float):
+    """
+    Build a batched request body using Triton's binary data extension.
+    
+    The prompts stay in the JSON header (BYTES input of shape [N, 1]); the
+    numeric and bool inputs are broadcast to every row and packed as raw
+    little-endian bytes after the header. Only the prompts entry is encoded
+    per call; the rest of the header is serialized once per batch size.
+    
+    Returns:
+        Tuple of (request body, JSON header length)
+    """
+    n = len(prompts)
+    prompts_input = orjson.dumps({
+        "name": "prompts",
+        "shape": [n, 1],
+        "datatype": "BYTES",
+        "data": list(prompts)
+    })
+    header = b'{"inputs":[' + prompts_input + _header_suffix(n)
+    tail = _tail_struct(n).pack(
+        *[max_tokens] * n, *[temperature] * n, *[top_p] * n, *[False] * (2 * n)
+    )
+    return header + tail, len(header)
+
+
+def _parse_response(headers, content: bytes) -> dict:
+    """
+    Decode a Triton response, splitting off the binary tail if there is one.
+    
+    BYTES outputs returned as binary data are decoded back into their
+    "data" lists so callers always see the JSON form.
+    """
+    header_length = headers.get("Inference-Header-Content-Length")
+    if header_length is None:
+        return orjson.loads(content)
+    
+    header_length = int(header_length)
+    result = orjson.loads(content[:header_length])
+    
+    offset = header_length
+    for output in result.get("outputs", []):
+        size = output.get("parameters", {}).get("binary_data_size")
+        if size is None:
+            continue
+        raw = content[offset:offset + size]
+        offset += size
+        if output["datatype"] == "BYTES":
+            # Each element is a 4-byte little-endian length followed by its bytes
+            data, pos = [], 0
+            while pos < len(raw):
+                (length,) = struct.unpack_from("<I", raw, pos)
+                pos += 4
+                data.append(raw[pos:pos + length].decode("utf-8"))
+                pos += length
+            output["data"] = data
+    return result
+
+
+def _extract_texts(result: dict):
+    """Return the generated texts (one per prompt) from a decoded response, or the raw result"""
+    if "outputs" in result:
+        for output in result["outputs"]:
+            if output["name"] == "outputs":
+                return list(output["data"])
+    return result
+
+
+def _first(texts):
+    """Unwrap a single-prompt result from _extract_texts"""
+    return texts[0] if isinstance(texts, list) else texts
+
+
+def _request_headers(header_length: int) -> dict:
+    """HTTP headers for a binary data extension request"""
+    return {
+        "Content-Type": "application/octet-stream",
+        "Inference-Header-Content-Length": str(header_length)
+    }
+
+
+def _get_grpc_client():
+    """Return the shared Triton gRPC client, creating it on first use"""
+    global _GRPC_CLIENT
+    if _GRPC_CLIENT is None:
+        import tritonclient.grpc as grpcclient
+        _GRPC_CLIENT = grpcclient.InferenceServerClient(url=TRITON_GRPC_URL, ssl=True)
+    return _GRPC_CLIENT
+
+
+def query_triton_llm_grpc(prompt: str, max_tokens: int = 100, temperature: float = 0.7, top_p: float = 0.9):
+    """
+    Query the Triton LLM server over gRPC.
+    
+    Inputs are sent as protobuf tensors on a persistent HTTP/2 channel,
+    avoiding the HTTP/JSON framing of query_triton_llm's HTTP path.
+    
+    Args:
+        prompt: The input text prompt
+        max_tokens: Maximum number of tokens to generate
+        temperature: Sampling temperature (0.0 to 1.0)
+        top_p: Nucleus sampling parameter
+    
+    Returns:
+        The generated text response, or None on error
+    """
+    import numpy as np
+    import tritonclient.grpc as grpcclient
+    from tritonclient.utils import InferenceServerException
+    
+    tensors = [
+        ("prompts", "BYTES", np.array([[prompt]], dtype=object)),
+        ("max_output_len", "INT64", np.array([[max_tokens]], dtype=np.int64)),
+        ("temperature", "FP32", np.array([[temperature]], dtype=np.float32)),
+        ("top_p", "FP32", np.array([[top_p]], dtype=np.float32)),
+        ("output_context_logits", "BOOL", np.array([[False]], dtype=bool)),
+        ("output_generation_logits", "BOOL", np.array([[False]], dtype=bool)),
+    ]
+    inputs = []
+    for name, datatype, array in tensors:
+        infer_input = grpcclient.InferInput(name, list(array.shape), datatype)
+        infer_input.set_data_from_numpy(array)
+        inputs.append(infer_input)
+    
+    try:
+        result = _get_grpc_client().infer(
+            TRITON_MODEL_NAME,
+            inputs,
+            outputs=[grpcclient.InferRequestedOutput("outputs")]
+        )
+        text = result.as_numpy("outputs").ravel()[0]
+        return text.decode("utf-8") if isinstance(text, bytes) else text
+    
+    except InferenceServerException as e:
+        print(f"Error calling Triton server: {e}")
+        return None
+
+
+class _QueryFailed(Exception):
+    """Raised inside the response cache so failed queries are not cached"""
+
+
+def _query_triton_llm_uncached(prompt: str, max_tokens: int, temperature: float, top_p: float):
+    """Send a single prompt over gRPC or HTTP, depending on TRITON_USE_GRPC"""
+    if TRITON_USE_GRPC:
+        return query_triton_llm_grpc(prompt, max_tokens, temperature, top_p)
+    
+    texts = query_triton_llm_many([prompt], max_tokens, temperature, top_p)
+    return None if texts is None else _first(texts)
+
+
+@lru_cache(maxsize=1024)
+def _query_triton_llm_cached(prompt: str, max_tokens: int, top_p: float):
+    """Greedy (temperature 0) queries are deterministic, so their responses are cached"""
+    response = _query_triton_llm_uncached(prompt, max_tokens, 0.0, top_p)
+    if response is None:
+        raise _QueryFailed
+    return response
+
 
 def query_triton_llm(prompt: str, max_tokens: int = 100, temperature: float = 0.7, top_p: float = 0.9):
     """
     Query the Triton LLM server with a prompt.
     
+    Uses gRPC when TRITON_USE_GRPC=1, otherwise HTTP with the binary data
+    extension. Responses to temperature 0.0 queries are deterministic and
+    served from an in-process LRU cache after the first call.
+    
     Args:
         prompt: The input text prompt
         max_tokens: Maximum number of tokens to generate
         temperature: Sampling temperature (0.0 to 1.0)
         top_p: Nucleus sampling parameter
-        
+    
     Returns:
         The generated text response
     """
-    url = "https://nvidia-triton-inference.ccrolabs.com/v2/models/llama31-8b/infer"
-    
-    payload = {
-        "inputs": [
-            {
-                "name": "prompts",
-                "shape": [1, 1],
-                "datatype": "BYTES",
-                "data": [prompt]
-            },
-            {
-                "name": "max_output_len",
-                "shape": [1, 1],
-                "datatype": "INT64",
-                "data": [max_tokens]
-            },
-            {
-                "name": "temperature",
-                "shape": [1, 1],
-                "datatype": "FP32",
-                "data": [temperature]
-            },
-            {
-                "name": "top_p",
-                "shape": [1, 1],
-                "datatype": "FP32",
-                "data": [top_p]
-            },
-            {
-                "name": "output_context_logits",
-                "shape": [1, 1],
-                "datatype": "BOOL",
-                "data": [False]
-            },
-            {
-                "name": "output_generation_logits",
-                "shape": [1, 1],
-                "datatype": "BOOL",
-                "data": [False]
-            }
-        ]
-    }
+    if temperature == 0.0:
+        try:
+            return _query_triton_llm_cached(prompt, max_tokens, top_p)
+        except _QueryFailed:
+            return None
     
-    headers = {
-        "Content-Type": "application/json"
-    }
+    return _query_triton_llm_uncached(prompt, max_tokens, temperature, top_p)
+
+
+def query_triton_llm_many(prompts: List[str], max_tokens: int = 100, temperature: float = 0.7, top_p: float = 0.9):
+    """
+    Query the Triton LLM server with many prompts in a single request.
+    
+    All prompts share one HTTP round trip and one Triton dispatch; the
+    sampling parameters are applied to every prompt.
+    
+    Args:
+        prompts: List of input text prompts
+        max_tokens: Maximum number of tokens to generate
+        temperature: Sampling temperature (0.0 to 1.0)
+        top_p: Nucleus sampling parameter
+    
+    Returns:
+        List of generated text responses in prompt order, or None on error
+    """
+    body, header_length = _build_request(prompts, max_tokens, temperature, top_p)
     
     try:
-        response = requests.post(url, json=payload, headers=headers, verify=True)
+        response = _SESSION.post(TRITON_URL, data=body, headers=_request_headers(header_length), verify=True)
         response.raise_for_status()
         
-        result = response.json()
-        # Extract the generated text from the response
-        if "outputs" in result:
-            for output in result["outputs"]:
-                if output["name"] == "outputs":
-                    return output["data"][0]
-        return result
-        
+        # Extract the generated texts from the response
+        return _extract_texts(_parse_response(response.headers, response.content))
+    
     except requests.exceptions.RequestException as e:
         print(f"Error calling Triton server: {e}")
         return None
 
+
+async def query_triton_llm_async(prompt: str, max_tokens: int = 100, temperature: float = 0.7,
+                                 top_p: float = 0.9, session: Optional[aiohttp.ClientSession] = None):
+    """
+    Async version of query_triton_llm for use inside an event loop.
+    
+    Args:
+        prompt: The input text prompt
+        max_tokens: Maximum number of tokens to generate
+        temperature: Sampling temperature (0.0 to 1.0)
+        top_p: Nucleus sampling parameter
+        session: aiohttp session to use (defaults to the shared module session)
+    
+    Returns:
+        The generated text response, or None on error
+    """
+    session = session or _get_async_session()
+    body, header_length = _build_request([prompt], max_tokens, temperature, top_p)
+    
+    try:
+        async with session.post(TRITON_URL, data=body, headers=_request_headers(header_length)) as response:
+            response.raise_for_status()
+            content = await response.read()
+            return _first(_extract_texts(_parse_response(response.headers, content)))
+    
+    except aiohttp.ClientError as e:
+        print(f"Error calling Triton server: {e}")
+        return None
+
+
+async def _gather(prompts: List[str], **kwargs) -> list:
+    """Run all prompts concurrently on one session scoped to the current loop"""
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300)
+    ) as session:
+        return await asyncio.gather(
+            *[query_triton_llm_async(p, session=session, **kwargs) for p in prompts]
+        )
+
+
+def query_triton_llm_batch(prompts: List[str], **kwargs) -> list:
+    """
+    Query the Triton LLM server for many prompts concurrently.
+    
+    Use this instead of calling query_triton_llm in a loop: total latency is
+    roughly that of the slowest request rather than the sum of all of them.
+    Must be called from synchronous code; async callers should gather
+    query_triton_llm_async directly.
+    
+    Args:
+        prompts: List of input text prompts
+        **kwargs: max_tokens, temperature, top_p as for query_triton_llm
+    
+    Returns:
+        List of generated text responses (None for failed requests), in prompt order
+    """
+    return asyncio.run(_gather(prompts, **kwargs))
+
 # Example usage
 if __name__ == "__main__":
     prompt = "What is AI?"
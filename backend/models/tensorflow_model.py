@@ -7,9 +7,14 @@ import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras import layers, models
 from tensorflow.keras.callbacks import Callback
+import bisect
 import pickle
-from typing import List
-from .base_model import BaseHousingModel
+from typing import Callable, List, Optional
+from .base_model import BaseHousingModel, to_f32
+
+# Batch sizes the XLA predict step is compiled for; inputs are zero-padded up
+# to the nearest one, so micro-batches of any size reuse a handful of kernels
+PREDICT_BUCKETS = (1, 8, 64, 512, 8192)
 
 
 class TrainingProgressCallback(Callback):
@@ -42,6 +47,7 @@ class TensorFlowModel(BaseHousingModel):
         """
         super().__init__(input_size, hidden_sizes, output_size, learning_rate)
         self.model = self._build_model()
+        self._predict_step = self._make_predict_step()
     
     def _build_model(self):
         """Build the Keras model architecture"""
@@ -75,8 +81,27 @@ class TensorFlowModel(BaseHousingModel):
         
         return model
     
+    def _make_predict_step(self):
+        """
+        XLA-compiled forward pass, bypassing Keras' model.predict machinery
+        
+        XLA compiles one kernel per concrete input shape, so predict only
+        calls this with PREDICT_BUCKETS batch sizes (at most one compile each).
+        """
+        model = self.model
+        
+        @tf.function(
+            jit_compile=True,
+            input_signature=[tf.TensorSpec([None, self.input_size], tf.float32)]
+        )
+        def predict_step(x):
+            return model(x, training=False)
+        
+        return predict_step
+    
     def train(self, X: np.ndarray, y: np.ndarray, epochs: int = 500, 
-              batch_size: int = 32, verbose: bool = True) -> List[float]:
+              batch_size: int = 32, verbose: bool = True,
+              progress_cb: Optional[Callable[[int, int], None]] = None) -> List[float]:
         """
         Train the neural network
         
@@ -86,20 +111,34 @@ class TensorFlowModel(BaseHousingModel):
             epochs: Number of training epochs
             batch_size: Batch size for training
             verbose: Print training progress
+            progress_cb: Optional callback called as progress_cb(epoch, epochs)
         
         Returns:
             Training history with losses per epoch
         """
         # Create progress callback
         progress_callback = TrainingProgressCallback()
+        callbacks = [progress_callback] if verbose else []
+        if progress_cb is not None:
+            callbacks.append(keras.callbacks.LambdaCallback(
+                on_epoch_end=lambda epoch, logs: progress_cb(epoch + 1, epochs)
+            ))
+        
+        # Input pipeline: cached tensors, reshuffled each epoch, next batch prefetched
+        dataset = (
+            tf.data.Dataset.from_tensor_slices((to_f32(X), to_f32(y)))
+            .cache()
+            .shuffle(min(len(X), 10_000), reshuffle_each_iteration=True)
+            .batch(batch_size, drop_remainder=False)
+            .prefetch(tf.data.AUTOTUNE)
+        )
         
         # Train the model
         history = self.model.fit(
-            X, y,
+            dataset,
             epochs=epochs,
-            batch_size=batch_size,
             verbose=0,  # We use custom callback for progress
-            callbacks=[progress_callback] if verbose else []
+            callbacks=callbacks
         )
         
         # Store training history
@@ -107,17 +146,35 @@ class TensorFlowModel(BaseHousingModel):
         
         return progress_callback.losses if verbose else history.history['loss']
     
-    def predict(self, X: np.ndarray) -> np.ndarray:
+    def predict(self, X: np.ndarray, batch_size: int = 8192) -> np.ndarray:
         """
         Make predictions on new data
         
         Args:
             X: Input data
+            batch_size: Maximum rows run through the model at once (bounds peak
+                memory; capped at the largest of PREDICT_BUCKETS)
         
         Returns:
             Predictions
         """
-        return self.model.predict(X, verbose=0)
+        X = to_f32(X)
+        batch_size = min(batch_size, PREDICT_BUCKETS[-1])
+        predictions = np.empty((X.shape[0], self.output_size), dtype=np.float32)
+        
+        for start in range(0, X.shape[0], batch_size):
+            chunk = X[start:start + batch_size]
+            rows = chunk.shape[0]
+            bucket = PREDICT_BUCKETS[bisect.bisect_left(PREDICT_BUCKETS, rows)]
+            if bucket != rows:
+                # Pad to the bucket size and drop the padding rows' outputs
+                padded = np.zeros((bucket, chunk.shape[1]), dtype=np.float32)
+                padded[:rows] = chunk
+                chunk = padded
+            output = self._predict_step(tf.convert_to_tensor(chunk)).numpy()
+            predictions[start:start + rows] = output[:rows]
+        
+        return predictions
     
     def save(self, filepath: str) -> None:
         """Save model to file"""
@@ -137,7 +194,7 @@ class TensorFlowModel(BaseHousingModel):
             'model_type': 'tensorflow'
         }
         with open(f"{filepath}_metadata.pkl", 'wb') as f:
-            pickle.dump(metadata, f)
+            pickle.dump(metadata, f, protocol=pickle.HIGHEST_PROTOCOL)
     
     def load(self, filepath: str) -> None:
         """Load model from file"""
@@ -155,6 +212,9 @@ class TensorFlowModel(BaseHousingModel):
             self.hidden_sizes = metadata['hidden_sizes']
             self.output_size = metadata['output_size']
             self.learning_rate = metadata['learning_rate']
+        
+        # Rebuilt after the metadata so the signature uses the loaded input size
+        self._predict_step = self._make_predict_step()
     
     def summary(self) -> None:
         """Print model architecture summary"""
@@ -5,11 +5,49 @@ Uses gradient boosting - one of the best algorithms for tabular data!
 XGBoost (Extreme Gradient Boosting) is a powerful, efficient implementation
 of gradient boosting that consistently wins machine learning competitions.
 """
+import contextlib
 import numpy as np
 import xgboost as xgb
+import os
 import pickle
-from typing import List
-from .base_model import BaseHousingModel
+from functools import lru_cache
+from typing import Callable, List, Optional
+from .base_model import BaseHousingModel, to_f32
+from config import XGBOOST_N_JOBS
+
+
+@lru_cache(maxsize=None)
+def _cuda_available() -> bool:
+    """True if this XGBoost build supports CUDA and a GPU is visible"""
+    if not xgb.build_info().get('USE_CUDA', False):
+        return False
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def _device_params() -> dict:
+    """Histogram tree method on the GPU when available, otherwise on the CPU"""
+    return {
+        'tree_method': 'hist',
+        'device': 'cuda' if _cuda_available() else 'cpu',
+        'max_bin': 256
+    }
+
+
+class BoostingProgressCallback(xgb.callback.TrainingCallback):
+    """Reports boosting progress as progress_cb(round, total_rounds)"""
+    
+    def __init__(self, progress_cb: Callable[[int, int], None], total_rounds: int):
+        super().__init__()
+        self.progress_cb = progress_cb
+        self.total_rounds = total_rounds
+    
+    def after_iteration(self, model, epoch, evals_log) -> bool:
+        self.progress_cb(epoch + 1, self.total_rounds)
+        return False  # Never stop training
 
 
 class XGBoostModel(BaseHousingModel):
@@ -57,8 +95,9 @@ class XGBoostModel(BaseHousingModel):
             'reg_alpha': 0.1,  # L1 regularization
             'reg_lambda': 1.0,  # L2 regularization
             'random_state': 42,
-            'n_jobs': -1,  # Use all CPU cores
-            'verbosity': 0  # Quiet mode
+            'n_jobs': XGBOOST_N_JOBS,  # Threads per process (-1 = all cores)
+            'verbosity': 0,  # Quiet mode
+            **_device_params()
         }
         
         self.model = None
@@ -70,12 +109,16 @@ class XGBoostModel(BaseHousingModel):
         print(f"  • Max depth: 6")
     
     def train(self, X: np.ndarray, y: np.ndarray, epochs: int = 100, 
-              batch_size: int = 32, verbose: bool = True) -> List[float]:
+              batch_size: int = 32, verbose: bool = True,
+              progress_cb: Optional[Callable[[int, int], None]] = None,
+              early_stopping_rounds: int = 20, eval_frac: float = 0.1) -> List[float]:
         """
         Train XGBoost model
         
         Note: XGBoost uses boosting rounds instead of epochs.
         The epochs parameter is mapped to n_estimators (number of trees).
+        Training stops early once the validation RMSE has not improved for
+        early_stopping_rounds rounds, keeping only the trees up to the best one.
         
         Args:
             X: Training features
@@ -83,6 +126,9 @@ class XGBoostModel(BaseHousingModel):
             epochs: Number of boosting rounds (maps to n_estimators)
             batch_size: Not used by XGBoost (kept for compatibility)
             verbose: Print training progress
+            progress_cb: Optional callback called as progress_cb(round, epochs)
+            early_stopping_rounds: Rounds without improvement before stopping (0 disables)
+            eval_frac: Fraction of the training rows held out for validation
             
         Returns:
             List of training losses (one per boosting round)
@@ -97,15 +143,31 @@ class XGBoostModel(BaseHousingModel):
             print(f"   Boosting rounds: {epochs}")
             print(f"   Learning rate: {self.learning_rate}")
         
-        # Reshape y if needed
-        if y.ndim > 1:
-            y = y.ravel()
+        # XGBoost stores data as float32; converting up front avoids a second copy
+        X = to_f32(X)
+        y = to_f32(y).ravel()
+        
+        # Hold out the last rows for early stopping (callers pass shuffled data)
+        n_valid = int(len(X) * eval_frac) if early_stopping_rounds > 0 else 0
+        if n_valid > 0:
+            X, X_valid = X[:-n_valid], X[-n_valid:]
+            y, y_valid = y[:-n_valid], y[-n_valid:]
         
-        # Create DMatrix (XGBoost's internal data structure)
-        dtrain = xgb.DMatrix(X, label=y)
+        # QuantileDMatrix stores the pre-binned histogram inputs that 'hist' needs,
+        # instead of the raw values a DMatrix would quantize again
+        dtrain = xgb.QuantileDMatrix(X, label=y, max_bin=self.params['max_bin'], nthread=self.params['n_jobs'])
+        evals = [(dtrain, 'train')]
         
         # Store evaluation results
         evals_result = {}
+        callbacks = [BoostingProgressCallback(progress_cb, epochs)] if progress_cb else []
+        
+        if n_valid > 0:
+            # Validation bins must come from the training matrix (ref=dtrain)
+            dvalid = xgb.QuantileDMatrix(X_valid, label=y_valid, ref=dtrain, nthread=self.params['n_jobs'])
+            # The last entry in evals is the one early stopping monitors
+            evals.append((dvalid, 'valid'))
+            callbacks.append(xgb.callback.EarlyStopping(rounds=early_stopping_rounds, save_best=True))
         
         try:
             if verbose:
@@ -115,9 +177,10 @@ class XGBoostModel(BaseHousingModel):
                     params=self.params,
                     dtrain=dtrain,
                     num_boost_round=epochs,
-                    evals=[(dtrain, 'train')],
+                    evals=evals,
                     evals_result=evals_result,
-                    verbose_eval=max(1, epochs // 10)  # Print every 10%
+                    verbose_eval=max(1, epochs // 10),  # Print every 10%
+                    callbacks=callbacks
                 )
             else:
                 # Train quietly
@@ -126,9 +189,10 @@ class XGBoostModel(BaseHousingModel):
                     params=self.params,
                     dtrain=dtrain,
                     num_boost_round=epochs,
-                    evals=[(dtrain, 'train')],
+                    evals=evals,
                     evals_result=evals_result,
-                    verbose_eval=False
+                    verbose_eval=False,
+                    callbacks=callbacks
                 )
             
             self.is_fitted = True
@@ -159,11 +223,8 @@ class XGBoostModel(BaseHousingModel):
         if not self.is_fitted:
             raise RuntimeError("Model not fitted! Call train() first.")
         
-        # Create DMatrix for prediction
-        dtest = xgb.DMatrix(X)
-        
-        # Make predictions
-        predictions = self.model.predict(dtest)
+        # Predict straight from the array; no DMatrix is built per call
+        predictions = self.model.inplace_predict(to_f32(X))
         
         # Reshape to match expected format
         if predictions.ndim == 1:
@@ -181,9 +242,9 @@ class XGBoostModel(BaseHousingModel):
         if filepath.endswith('.pkl'):
             filepath = filepath[:-4]
         
-        # Save XGBoost model
+        # Save XGBoost model (binary UBJSON: smaller and faster to parse than JSON)
         if self.model:
-            self.model.save_model(f"{filepath}.json")
+            self.model.save_model(f"{filepath}.ubj")
         
         # Save metadata
         metadata = {
@@ -197,9 +258,9 @@ class XGBoostModel(BaseHousingModel):
             'is_fitted': self.is_fitted
         }
         with open(f"{filepath}_metadata.pkl", 'wb') as f:
-            pickle.dump(metadata, f)
+            pickle.dump(metadata, f, protocol=pickle.HIGHEST_PROTOCOL)
         
-        print(f"✓ XGBoost model saved to {filepath}.json")
+        print(f"✓ XGBoost model saved to {filepath}.ubj")
     
     def load(self, filepath: str) -> None:
         """
@@ -220,15 +281,32 @@ class XGBoostModel(BaseHousingModel):
         self.output_size = metadata['output_size']
         self.learning_rate = metadata['learning_rate']
         self.n_estimators = metadata.get('n_estimators', 100)
-        self.params = metadata.get('params', self.params)
+        # Saved params may come from a host with a different device
+        self.params = {**metadata.get('params', self.params), **_device_params()}
         self.is_fitted = metadata['is_fitted']
         
-        # Load XGBoost model
+        # Load XGBoost model (models saved before the switch to UBJSON are .json)
+        model_file = f"{filepath}.ubj" if os.path.exists(f"{filepath}.ubj") else f"{filepath}.json"
         if self.is_fitted:
             self.model = xgb.Booster()
-            self.model.load_model(f"{filepath}.json")
+            self.model.load_model(model_file)
         
-        print(f"✓ XGBoost model loaded from {filepath}.json")
+        print(f"✓ XGBoost model loaded from {model_file}")
+    
+    @contextlib.contextmanager
+    def thread_limit(self, n_threads: Optional[int]):
+        """Train with n_threads; the fitted booster predicts with the configured count again"""
+        if n_threads is None:
+            yield
+            return
+        previous = self.params['n_jobs']
+        self.params['n_jobs'] = n_threads
+        try:
+            yield
+        finally:
+            self.params['n_jobs'] = previous
+            if self.model is not None:
+                self.model.set_param({'nthread': previous})
     
     def summary(self) -> None:
         """Print model summary"""
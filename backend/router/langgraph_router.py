@@ -4,23 +4,69 @@ LangGraph Router for Intelligent Model Selection
 Uses LangGraph to create a decision graph that routes requests
 to the appropriate model based on criteria and context.
 """
+from functools import lru_cache
 from typing import Dict, List, Optional, TypedDict, Annotated
 import operator
 from langgraph.graph import StateGraph, END
-from .model_selector import select_model_by_criteria, get_model_characteristics
+from .model_selector import select_model_by_criteria, get_model_characteristics, ModelCharacteristics
+
+
+# Explanation set by each selection node
+_EXPLANATIONS: Dict[str, str] = {
+    "tensorflow": "Using TensorFlow model: Industry standard, production-ready",
+    "pytorch": "Using PyTorch model: Fast inference, research-friendly",
+    "xgboost": "Using XGBoost model: Gradient boosting, best for tabular data",
+    "ensemble": "Using Ensemble: Combining all three models for maximum accuracy",
+}
+
+# Default ensemble weights (can be adjusted based on validation performance)
+_ENSEMBLE_WEIGHTS: Dict[str, float] = {
+    "tensorflow": 0.3,
+    "pytorch": 0.3,
+    "xgboost": 0.4
+}
 
 
 class ModelState(TypedDict):
-    """State for the model selection graph"""
-    features: Dict  # Input features for prediction
+    """
+    State for the model selection graph
+    
+    Only fields read or written by the nodes are channels; request
+    metadata is built outside the graph by request_metadata.
+    """
     model_preference: Optional[str]  # User's model preference
     criteria: Optional[Dict]  # Selection criteria
     selected_model: Optional[str]  # Selected model type
-    predictions: Dict[str, float]  # Predictions from each model
-    final_prediction: Optional[float]  # Final prediction result
     explanation: str  # Explanation of model selection
     ensemble_weights: Dict[str, float]  # Weights for ensemble
-    metadata: Dict  # Additional metadata
+
+
+# Starting graph state; copied per request and only the request fields are set
+# (empty containers are replaced, never mutated, by the nodes)
+_INITIAL_STATE: ModelState = {
+    "model_preference": "auto",
+    "criteria": {},
+    "selected_model": None,
+    "explanation": "",
+    "ensemble_weights": {}
+}
+
+
+def _initial_state(model_preference: Optional[str], criteria: Optional[Dict]) -> ModelState:
+    """Fresh graph state for a request"""
+    state = _INITIAL_STATE.copy()
+    state["model_preference"] = model_preference
+    state["criteria"] = criteria or {}
+    return state
+
+
+def request_metadata(features, model_preference: Optional[str]) -> Dict:
+    """Metadata about a routed request"""
+    return {
+        "feature_count": len(features),
+        "has_preference": model_preference != "auto",
+        "analysis_complete": True
+    }
 
 
 def analyze_request(state: ModelState) -> ModelState:
@@ -38,18 +84,9 @@ def analyze_request(state: ModelState) -> ModelState:
     if not criteria:
         criteria = {"priority": "accuracy"}
     
-    # Analyze features to provide context
-    features = state.get("features", {})
-    
-    # Add metadata about the request
-    metadata = {
-        "feature_count": len(features),
-        "has_preference": model_preference != "auto",
-        "analysis_complete": True
-    }
-    
     state["criteria"] = criteria
-    state["metadata"] = metadata
+    # Select the model here, once, so the conditional edge only has to read it
+    state["selected_model"] = select_model_by_criteria(model_preference, criteria)
     state["explanation"] = "Request analyzed and ready for routing."
     
     return state
@@ -59,29 +96,16 @@ def route_to_model(state: ModelState) -> str:
     """
     Routing function that decides which model to use
     
-    This is the conditional edge function that determines
-    the next node based on the selected model.
+    This is the conditional edge function that determines the next
+    node; the selection itself was made by analyze_request.
     """
-    # Use model selector to choose model
-    model_preference = state.get("model_preference", "auto")
-    criteria = state.get("criteria", {})
-    
-    selected_model = select_model_by_criteria(model_preference, criteria)
-    
-    # Store selection in state
-    state["selected_model"] = selected_model
-    
-    # Return the routing decision
-    if selected_model == "ensemble":
-        return "ensemble"
-    else:
-        return selected_model
+    return state["selected_model"]
 
 
 def use_tensorflow_model(state: ModelState) -> ModelState:
     """Node for TensorFlow model prediction"""
     state["selected_model"] = "tensorflow"
-    state["explanation"] = "Using TensorFlow model: Industry standard, production-ready"
+    state["explanation"] = _EXPLANATIONS["tensorflow"]
     
     # Actual prediction will be done by the caller
     # This node just marks the selection
@@ -91,7 +115,7 @@ def use_tensorflow_model(state: ModelState) -> ModelState:
 def use_pytorch_model(state: ModelState) -> ModelState:
     """Node for PyTorch model prediction"""
     state["selected_model"] = "pytorch"
-    state["explanation"] = "Using PyTorch model: Fast inference, research-friendly"
+    state["explanation"] = _EXPLANATIONS["pytorch"]
     
     return state
 
@@ -99,7 +123,7 @@ def use_pytorch_model(state: ModelState) -> ModelState:
 def use_xgboost_model(state: ModelState) -> ModelState:
     """Node for XGBoost gradient boosting prediction"""
     state["selected_model"] = "xgboost"
-    state["explanation"] = "Using XGBoost model: Gradient boosting, best for tabular data"
+    state["explanation"] = _EXPLANATIONS["xgboost"]
     
     return state
 
@@ -112,70 +136,75 @@ def ensemble_predictions(state: ModelState) -> ModelState:
     Actual ensemble logic is handled by the caller.
     """
     state["selected_model"] = "ensemble"
-    state["explanation"] = "Using Ensemble: Combining all three models for maximum accuracy"
-    
-    # Default ensemble weights (can be adjusted based on validation performance)
-    state["ensemble_weights"] = {
-        "tensorflow": 0.3,
-        "pytorch": 0.3,
-        "xgboost": 0.4
-    }
+    state["explanation"] = _EXPLANATIONS["ensemble"]
+    state["ensemble_weights"] = dict(_ENSEMBLE_WEIGHTS)
     
     return state
 
 
+@lru_cache(maxsize=1)
+def _compiled_graph() -> StateGraph:
+    """
+    Create and compile the LangGraph decision graph
+    
+    Compiled once per process, on first use, and shared by every router.
+    
+    Returns:
+        Compiled StateGraph
+    """
+    # Create the graph
+    workflow = StateGraph(ModelState)
+    
+    # Add nodes
+    workflow.add_node("analyze", analyze_request)
+    workflow.add_node("select_tensorflow", use_tensorflow_model)
+    workflow.add_node("select_pytorch", use_pytorch_model)
+    workflow.add_node("select_xgboost", use_xgboost_model)
+    workflow.add_node("ensemble", ensemble_predictions)
+    
+    # Set entry point
+    workflow.set_entry_point("analyze")
+    
+    # Add conditional edges from analyze node
+    workflow.add_conditional_edges(
+        "analyze",
+        route_to_model,
+        {
+            "tensorflow": "select_tensorflow",
+            "pytorch": "select_pytorch",
+            "xgboost": "select_xgboost",
+            "ensemble": "ensemble"
+        }
+    )
+    
+    # All model selection nodes go to END
+    workflow.add_edge("select_tensorflow", END)
+    workflow.add_edge("select_pytorch", END)
+    workflow.add_edge("select_xgboost", END)
+    workflow.add_edge("ensemble", END)
+    
+    # No checkpointer: routing is stateless, so nothing is persisted between runs
+    return workflow.compile(checkpointer=None)
+
+
 class ModelRouter:
     """
     LangGraph-based router for model selection
     
     This class encapsulates the decision graph for routing
-    requests to the appropriate model.
+    requests to the appropriate model. The request path (route) makes
+    the same decision with direct function calls; the graph itself is
+    only built and run for debug_route.
     """
     
     def __init__(self):
-        """Initialize the router with compiled graph"""
-        self.graph = self._create_graph()
+        """Initialize the router"""
         self.characteristics = get_model_characteristics()
     
-    def _create_graph(self) -> StateGraph:
-        """
-        Create and compile the LangGraph decision graph
-        
-        Returns:
-            Compiled StateGraph
-        """
-        # Create the graph
-        workflow = StateGraph(ModelState)
-        
-        # Add nodes
-        workflow.add_node("analyze", analyze_request)
-        workflow.add_node("select_tensorflow", use_tensorflow_model)
-        workflow.add_node("select_pytorch", use_pytorch_model)
-        workflow.add_node("select_xgboost", use_xgboost_model)
-        workflow.add_node("ensemble", ensemble_predictions)
-        
-        # Set entry point
-        workflow.set_entry_point("analyze")
-        
-        # Add conditional edges from analyze node
-        workflow.add_conditional_edges(
-            "analyze",
-            route_to_model,
-            {
-                "tensorflow": "select_tensorflow",
-                "pytorch": "select_pytorch",
-                "xgboost": "select_xgboost",
-                "ensemble": "ensemble"
-            }
-        )
-        
-        # All model selection nodes go to END
-        workflow.add_edge("select_tensorflow", END)
-        workflow.add_edge("select_pytorch", END)
-        workflow.add_edge("select_xgboost", END)
-        workflow.add_edge("ensemble", END)
-        
-        return workflow.compile()
+    @property
+    def graph(self):
+        """Compiled decision graph (process-wide, built on first use)"""
+        return _compiled_graph()
     
     def route(self, features: Dict, model_preference: str = "auto", 
               criteria: Optional[Dict] = None) -> Dict:
@@ -190,42 +219,59 @@ class ModelRouter:
         Returns:
             Dictionary with routing decision and metadata
         """
-        # Create initial state
-        initial_state: ModelState = {
-            "features": features,
-            "model_preference": model_preference,
-            "criteria": criteria or {},
-            "selected_model": None,
-            "predictions": {},
-            "final_prediction": None,
-            "explanation": "",
-            "ensemble_weights": {},
-            "metadata": {}
+        # Same steps as the graph (analyze -> select node), without graph dispatch
+        analyzed = analyze_request(_initial_state(model_preference, criteria))
+        selected_model = analyzed["selected_model"]
+        
+        return {
+            "selected_model": selected_model,
+            "explanation": _EXPLANATIONS[selected_model],
+            "ensemble_weights": dict(_ENSEMBLE_WEIGHTS) if selected_model == "ensemble" else {},
+            "metadata": request_metadata(features, model_preference),
+            "model_info": self.characteristics[selected_model]
         }
+    
+    def debug_route(self, features: Dict, model_preference: str = "auto",
+                    criteria: Optional[Dict] = None) -> Dict:
+        """
+        Route a request by running the full LangGraph decision graph
+        
+        Produces the same result as route(); used to inspect the graph.
+        
+        Args:
+            features: Input features for prediction
+            model_preference: User's model preference
+            criteria: Selection criteria
         
+        Returns:
+            Dictionary with routing decision and metadata
+        """
         # Run the graph
-        result = self.graph.invoke(initial_state)
+        result = self.graph.invoke(_initial_state(model_preference, criteria))
         
         return {
             "selected_model": result["selected_model"],
             "explanation": result["explanation"],
             "ensemble_weights": result.get("ensemble_weights", {}),
-            "metadata": result.get("metadata", {}),
-            "model_info": self.characteristics.get(result["selected_model"], {})
+            "metadata": request_metadata(features, model_preference),
+            "model_info": self.characteristics[result["selected_model"]]
         }
     
-    def get_model_info(self, model_type: str) -> Dict:
-        """Get information about a specific model"""
-        return self.characteristics.get(model_type, {})
+    def get_model_info(self, model_type: str) -> Optional[ModelCharacteristics]:
+        """Get information about a specific model (None if unknown)"""
+        return self.characteristics.get(model_type)
     
-    def get_all_models_info(self) -> Dict[str, Dict]:
+    def get_all_models_info(self) -> Dict[str, ModelCharacteristics]:
         """Get information about all available models"""
         return self.characteristics
 
 
+@lru_cache(maxsize=1)
 def create_model_router() -> ModelRouter:
     """
-    Factory function to create a ModelRouter instance
+    Factory function for the process-wide ModelRouter
+    
+    The router holds no per-request state, so one instance is shared.
     
     Returns:
         Configured ModelRouter
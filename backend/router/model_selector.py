@@ -4,10 +4,21 @@ Model Selection Logic
 Contains criteria and logic for selecting the appropriate model
 based on request parameters and preferences.
 """
-from typing import Dict, Optional, Literal
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Literal, Tuple
 
 ModelType = Literal['tensorflow', 'pytorch', 'xgboost', 'ensemble']
 
+# Model types that can be requested explicitly
+_VALID_MODELS: FrozenSet[str] = frozenset(('tensorflow', 'pytorch', 'xgboost', 'ensemble'))
+
+# Criteria used when none are given, and per-field defaults
+_DEFAULT_CRITERIA: Dict[str, str] = {"priority": "accuracy"}
+_DEFAULT_PRIORITY = "accuracy"
+_DEFAULT_DATASET_SIZE = "medium"
+_DEFAULT_USE_CASE = "production"
+
 
 def select_model_by_criteria(
     model_preference: Optional[str] = "auto",
@@ -26,18 +37,38 @@ def select_model_by_criteria(
     Returns:
         Selected model type
     """
+    # Decisions depend only on the inputs, so they are memoized on a hashable key
+    try:
+        criteria_key = frozenset(criteria.items()) if criteria is not None else None
+    except TypeError:
+        # Unhashable criteria values; decide without the cache
+        return _select_model(model_preference, criteria)
+    return _select_model_cached(model_preference, criteria_key)
+
+
+@lru_cache(maxsize=256)
+def _select_model_cached(
+    model_preference: Optional[str],
+    criteria_key: Optional[FrozenSet[Tuple]]
+) -> ModelType:
+    """Memoized select_model_by_criteria keyed by frozen criteria items"""
+    criteria = dict(criteria_key) if criteria_key is not None else None
+    return _select_model(model_preference, criteria)
+
+
+def _select_model(model_preference: Optional[str], criteria: Optional[Dict]) -> ModelType:
+    """Selection rules behind select_model_by_criteria"""
     # If explicit preference provided, use it
-    if model_preference and model_preference != "auto":
-        if model_preference in ['tensorflow', 'pytorch', 'xgboost', 'ensemble']:
-            return model_preference
+    if model_preference and model_preference != "auto" and model_preference in _VALID_MODELS:
+        return model_preference
     
-    # Default criteria
+    # Default criteria (shared, only read)
     if criteria is None:
-        criteria = {"priority": "accuracy"}
+        criteria = _DEFAULT_CRITERIA
     
-    priority = criteria.get("priority", "accuracy")
-    dataset_size = criteria.get("dataset_size", "medium")
-    use_case = criteria.get("use_case", "production")
+    priority = criteria.get("priority", _DEFAULT_PRIORITY)
+    dataset_size = criteria.get("dataset_size", _DEFAULT_DATASET_SIZE)
+    use_case = criteria.get("use_case", _DEFAULT_USE_CASE)
     
     # Selection logic based on criteria
     
@@ -72,95 +103,140 @@ def select_model_by_criteria(
     return "tensorflow"
 
 
-def get_model_characteristics() -> Dict[str, Dict]:
+@dataclass(frozen=True, slots=True)
+class ModelCharacteristics:
+    """Descriptive characteristics of one model type (immutable, shared)"""
+    name: str
+    architecture: str
+    layers: str
+    parameters: str
+    framework: str
+    activation: str
+    optimizer: str
+    strengths: Tuple[str, ...]
+    best_for: str
+    training_speed: str
+    inference_speed: str
+    typical_use: str
+    
+    def as_dict(self) -> Dict:
+        """Plain dictionary of the characteristics (strengths stay a tuple)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+# Built once at import; every caller shares these instances
+_MODEL_CHARACTERISTICS: Dict[str, ModelCharacteristics] = {
+    "tensorflow": ModelCharacteristics(
+        name="TensorFlow/Keras ANN",
+        architecture="Dense Feedforward Network",
+        layers="8 → 64 → 32 → 16 → 1",
+        parameters="~3,201",
+        framework="TensorFlow 2.17",
+        activation="ReLU (hidden), Linear (output)",
+        optimizer="Adam",
+        strengths=(
+            "Industry standard",
+            "Excellent documentation",
+            "Production-ready",
+            "Well-optimized",
+            "GPU acceleration"
+        ),
+        best_for="Production deployments, proven results",
+        training_speed="Medium",
+        inference_speed="Fast",
+        typical_use="General ML tasks, CV, production systems"
+    ),
+    "pytorch": ModelCharacteristics(
+        name="PyTorch ANN",
+        architecture="Dense Feedforward Network",
+        layers="8 → 64 → 32 → 16 → 1",
+        parameters="~3,201",
+        framework="PyTorch 2.1",
+        activation="ReLU (hidden), Linear (output)",
+        optimizer="Adam",
+        strengths=(
+            "Research-friendly",
+            "Pythonic API",
+            "Dynamic computation graph",
+            "Fastest inference",
+            "Great debugging"
+        ),
+        best_for="Research, experimentation, custom architectures",
+        training_speed="Fast",
+        inference_speed="Very Fast",
+        typical_use="Research, custom models, rapid prototyping"
+    ),
+    "xgboost": ModelCharacteristics(
+        name="XGBoost Model",
+        architecture="Gradient Boosted Decision Trees",
+        layers="Ensemble of 100 decision trees",
+        parameters="Varies with tree depth and count",
+        framework="XGBoost",
+        activation="Decision rules (if-then logic)",
+        optimizer="Gradient Boosting",
+        strengths=(
+            "Best for tabular data",
+            "Fast training and inference",
+            "Built-in regularization",
+            "Feature importance analysis",
+            "Industry standard"
+        ),
+        best_for="Structured/tabular data, production systems",
+        training_speed="Fast",
+        inference_speed="Very Fast",
+        typical_use="Tabular data, structured datasets, competitions"
+    ),
+    "ensemble": ModelCharacteristics(
+        name="Ensemble (All 3 Models)",
+        architecture="Combines TensorFlow, PyTorch, and XGBoost",
+        layers="Average of all model predictions",
+        parameters="Sum of all models",
+        framework="Multi-framework",
+        activation="Various",
+        optimizer="Various",
+        strengths=(
+            "Best accuracy",
+            "Reduces variance",
+            "Robust predictions",
+            "Combines strengths",
+            "Production-grade results"
+        ),
+        best_for="Maximum accuracy, critical predictions",
+        training_speed="N/A (uses trained models)",
+        inference_speed="Slow (3x)",
+        typical_use="Competitions, critical applications"
+    )
+}
+
+
+# Placeholder explained for a model type without characteristics
+_UNKNOWN_MODEL = ModelCharacteristics(
+    name="N/A",
+    architecture="N/A",
+    layers="N/A",
+    parameters="N/A",
+    framework="N/A",
+    activation="N/A",
+    optimizer="N/A",
+    strengths=(),
+    best_for="general use",
+    training_speed="N/A",
+    inference_speed="N/A",
+    typical_use="N/A"
+)
+
+
+def get_model_characteristics() -> Dict[str, ModelCharacteristics]:
     """
     Get characteristics of each model for comparison
     
+    Returns the shared module-level mapping (not a copy); use
+    ModelCharacteristics.as_dict() where a plain dictionary is needed.
+    
     Returns:
-        Dictionary with model characteristics
+        Dictionary mapping model type to its ModelCharacteristics
     """
-    return {
-        "tensorflow": {
-            "name": "TensorFlow/Keras ANN",
-            "architecture": "Dense Feedforward Network",
-            "layers": "8 → 64 → 32 → 16 → 1",
-            "parameters": "~3,201",
-            "framework": "TensorFlow 2.17",
-            "activation": "ReLU (hidden), Linear (output)",
-            "optimizer": "Adam",
-            "strengths": [
-                "Industry standard",
-                "Excellent documentation",
-                "Production-ready",
-                "Well-optimized",
-                "GPU acceleration"
-            ],
-            "best_for": "Production deployments, proven results",
-            "training_speed": "Medium",
-            "inference_speed": "Fast",
-            "typical_use": "General ML tasks, CV, production systems"
-        },
-        "pytorch": {
-            "name": "PyTorch ANN",
-            "architecture": "Dense Feedforward Network",
-            "layers": "8 → 64 → 32 → 16 → 1",
-            "parameters": "~3,201",
-            "framework": "PyTorch 2.1",
-            "activation": "ReLU (hidden), Linear (output)",
-            "optimizer": "Adam",
-            "strengths": [
-                "Research-friendly",
-                "Pythonic API",
-                "Dynamic computation graph",
-                "Fastest inference",
-                "Great debugging"
-            ],
-            "best_for": "Research, experimentation, custom architectures",
-            "training_speed": "Fast",
-            "inference_speed": "Very Fast",
-            "typical_use": "Research, custom models, rapid prototyping"
-        },
-        "xgboost": {
-            "name": "XGBoost Model",
-            "architecture": "Gradient Boosted Decision Trees",
-            "layers": "Ensemble of 100 decision trees",
-            "parameters": "Varies with tree depth and count",
-            "framework": "XGBoost",
-            "activation": "Decision rules (if-then logic)",
-            "optimizer": "Gradient Boosting",
-            "strengths": [
-                "Best for tabular data",
-                "Fast training and inference",
-                "Built-in regularization",
-                "Feature importance analysis",
-                "Industry standard"
-            ],
-            "best_for": "Structured/tabular data, production systems",
-            "training_speed": "Fast",
-            "inference_speed": "Very Fast",
-            "typical_use": "Tabular data, structured datasets, competitions"
-        },
-        "ensemble": {
-            "name": "Ensemble (All 3 Models)",
-            "architecture": "Combines TensorFlow, PyTorch, and XGBoost",
-            "layers": "Average of all model predictions",
-            "parameters": "Sum of all models",
-            "framework": "Multi-framework",
-            "activation": "Various",
-            "optimizer": "Various",
-            "strengths": [
-                "Best accuracy",
-                "Reduces variance",
-                "Robust predictions",
-                "Combines strengths",
-                "Production-grade results"
-            ],
-            "best_for": "Maximum accuracy, critical predictions",
-            "training_speed": "N/A (uses trained models)",
-            "inference_speed": "Slow (3x)",
-            "typical_use": "Competitions, critical applications"
-        }
-    }
+    return _MODEL_CHARACTERISTICS
 
 
 def explain_selection(model_type: str, criteria: Optional[Dict] = None) -> str:
@@ -174,19 +250,18 @@ def explain_selection(model_type: str, criteria: Optional[Dict] = None) -> str:
     Returns:
         Human-readable explanation
     """
-    characteristics = get_model_characteristics()
-    model_info = characteristics.get(model_type, {})
+    model_info = _MODEL_CHARACTERISTICS.get(model_type) or replace(_UNKNOWN_MODEL, name=model_type)
     
-    explanation = f"Selected {model_info.get('name', model_type)} because:\n"
+    explanation = f"Selected {model_info.name} because:\n"
     
     if criteria:
         priority = criteria.get("priority", "balanced")
         explanation += f"- Priority: {priority}\n"
-        explanation += f"- Best for: {model_info.get('best_for', 'general use')}\n"
+        explanation += f"- Best for: {model_info.best_for}\n"
     
-    explanation += f"- Architecture: {model_info.get('architecture', 'N/A')}\n"
-    explanation += f"- Training speed: {model_info.get('training_speed', 'N/A')}\n"
-    explanation += f"- Inference speed: {model_info.get('inference_speed', 'N/A')}\n"
+    explanation += f"- Architecture: {model_info.architecture}\n"
+    explanation += f"- Training speed: {model_info.training_speed}\n"
+    explanation += f"- Inference speed: {model_info.inference_speed}\n"
     
     return explanation
 
@@ -1,9 +1,25 @@
 """
 Shared dependencies and utilities for API routes
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+import os
+import time
+import numpy as np
+from config import (
+    PREDICT_WORKERS,
+    PREDICT_MAX_BATCH,
+    PREDICT_MAX_WAIT_MS,
+    MODEL_FILE_PATHS,
+    TRAINED_CHECK_TTL,
+    FEATURE_ORDER
+)
+from models import to_f32
 from services.training_service import HousePriceModel
+from services.batching_predictor import BatchingPredictor
 from router.langgraph_router import create_model_router
-from schemas.predict import PredictRequest
+from schemas.predict import PredictInput
 
 # Global model instances
 models = {
@@ -15,31 +31,105 @@ models = {
 # LangGraph router
 router = create_model_router()
 
+# Model inference is blocking, so it runs in a bounded thread pool to keep
+# the event loop free for light endpoints (/health, /task/*/status)
+predict_pool = ThreadPoolExecutor(max_workers=PREDICT_WORKERS, thread_name_prefix='predict')
 
-def build_features_dict(request: PredictRequest) -> dict:
-    """Helper function to build features dictionary from prediction request"""
-    sqft = float(request.sqft)
-    bedrooms = float(request.bedrooms)
-    bathrooms = float(request.bathrooms)
-    latitude = float(request.latitude)
-    longitude = float(request.longitude)
-    median_income = float(request.median_income)
-    house_age = float(request.house_age)
-    population = float(request.population)
+# One micro-batcher per model; each scores at most one batch at a time,
+# which also bounds how many pool threads inference can occupy
+predictors = {
+    model_type: BatchingPredictor(
+        model,
+        predict_pool,
+        max_batch=PREDICT_MAX_BATCH,
+        max_wait_ms=PREDICT_MAX_WAIT_MS
+    )
+    for model_type, model in models.items()
+}
+
+
+# model_type -> (checked at, saved model file or None)
+_TRAINED_CACHE: Dict[str, Tuple[float, Optional[str]]] = {}
+
+
+def trained_model_file(model_type: str) -> Optional[str]:
+    """
+    Return the saved model file for model_type, or None if it isn't trained
     
-    # Calculate derived features
-    ave_rooms = sqft / 200
-    ave_bedrms = bedrooms
-    ave_occup = population / 500 if population > 0 else 3.0
+    The file check is reused for TRAINED_CHECK_TTL seconds, so frequent
+    status polling doesn't stat the disk on every request.
+    """
+    now = time.monotonic()
+    cached = _TRAINED_CACHE.get(model_type)
+    if cached is not None and now - cached[0] < TRAINED_CHECK_TTL:
+        return cached[1]
     
-    return {
-        'MedInc': median_income,
-        'HouseAge': house_age,
-        'AveRooms': ave_rooms,
-        'AveBedrms': ave_bedrms,
-        'Population': population,
-        'AveOccup': ave_occup,
-        'Latitude': latitude,
-        'Longitude': longitude
-    }
+    model_file = next((path for path in MODEL_FILE_PATHS[model_type] if os.path.exists(path)), None)
+    _TRAINED_CACHE[model_type] = (now, model_file)
+    return model_file
+
+
+def invalidate_trained_cache(model_type: Optional[str] = None) -> None:
+    """Forget cached trained-file checks (all model types if model_type is None)"""
+    if model_type is None:
+        _TRAINED_CACHE.clear()
+    else:
+        _TRAINED_CACHE.pop(model_type, None)
+
+
+async def run_predict(model: HousePriceModel, features) -> float:
+    """Predict through the model's micro-batcher without blocking the event loop"""
+    return await predictors[model.model_type].submit(features)
+
+
+async def run_predict_all(features) -> Dict[str, object]:
+    """
+    Predict with every model concurrently
+    
+    Each model's batcher scores on its own pool thread, so latency is that of
+    the slowest model rather than the sum of all of them. The features are
+    converted to float32 once and that array is shared by every model, so
+    scaling and inference need no further dtype copies.
+    
+    Returns:
+        Dictionary mapping model type to its prediction, or to the exception it raised
+    """
+    shared_features = to_f32(features)
+    results = await asyncio.gather(
+        *(run_predict(model, shared_features) for model in models.values()),
+        return_exceptions=True
+    )
+    return dict(zip(models.keys(), results))
+
+
+def build_features_array(request: PredictInput) -> np.ndarray:
+    """
+    Build the model input vector (FEATURE_ORDER columns) from a prediction request
+    
+    PredictInput.from_dict has already validated the fields as numbers, so they go straight
+    into the array. float64 keeps features_used in responses exact; models
+    cast to float32 themselves.
+    """
+    population = request.population
+    
+    return np.array([
+        request.median_income,
+        request.house_age,
+        request.sqft / 200,  # AveRooms
+        request.bedrooms,  # AveBedrms
+        population,
+        population / 500 if population > 0 else 3.0,  # AveOccup
+        request.latitude,
+        request.longitude
+    ], dtype=np.float64)
+
+
+def features_to_dict(features: np.ndarray) -> dict:
+    """Name the values of a feature vector for API responses"""
+    return dict(zip(FEATURE_ORDER, features.tolist()))
+
+
+def build_features_dict(request: PredictInput) -> dict:
+    """Helper function to build features dictionary from prediction request"""
+    return features_to_dict(build_features_array(request))
 
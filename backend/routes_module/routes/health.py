@@ -1,39 +1,82 @@
 """
 Health check endpoints
 """
-from fastapi import APIRouter
+import asyncio
+import time
+import orjson
+from fastapi import APIRouter, Response
 from schemas.health import HealthResponse
 from celery_worker import health_check
+from config import CELERY_HEALTH_INTERVAL, CELERY_HEALTH_STALE_AFTER
 
 router = APIRouter()
 
+# /health never changes, so its body is validated and encoded once at import
+_HEALTH_BODY = orjson.dumps(HealthResponse(
+    status="healthy",
+    message="Multi-model API is running",
+    available_models=["tensorflow", "pytorch", "xgboost", "ensemble"]
+).model_dump())
 
-@router.get("/health", response_model=HealthResponse)
+# Latest background ping of the Celery workers: checked_at (monotonic), ok, and response or error
+_celery_health = {}
+
+
+def _ping_celery() -> dict:
+    """Submit a health check task and wait for a worker to answer (blocking)"""
+    try:
+        result = health_check.apply_async()
+        response = result.get(timeout=5)
+        return {'ok': True, 'worker_response': response}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+
+
+async def celery_health_pinger():
+    """
+    Ping the Celery workers every CELERY_HEALTH_INTERVAL seconds
+    
+    Runs for the lifetime of the app (started in the lifespan handler);
+    /celery/health only reads the last result.
+    """
+    while True:
+        result = await asyncio.to_thread(_ping_celery)
+        result['checked_at'] = time.monotonic()
+        _celery_health.update(result)
+        await asyncio.sleep(CELERY_HEALTH_INTERVAL)
+
+
+@router.get("/health", responses={200: {"model": HealthResponse}})
 async def health():
     """Health check endpoint"""
-    return HealthResponse(
-        status="healthy",
-        message="Multi-model API is running",
-        available_models=["tensorflow", "pytorch", "xgboost", "ensemble"]
-    )
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
 @router.get("/celery/health")
 async def celery_health():
-    """Check if Celery worker is responsive"""
-    try:
-        # Submit a simple health check task with timeout
-        result = health_check.apply_async()
-        response = result.get(timeout=5)
+    """Check if Celery worker is responsive (from the latest background ping)"""
+    if not _celery_health:
         return {
-            'success': True,
-            'celery_status': 'connected',
-            'worker_response': response
+            'success': False,
+            'celery_status': 'unknown',
+            'error': 'Celery health check has not completed yet'
         }
-    except Exception as e:
+    
+    age = time.monotonic() - _celery_health['checked_at']
+    status = {
+        'age_seconds': round(age, 1),
+        'stale': age > CELERY_HEALTH_STALE_AFTER
+    }
+    if _celery_health['ok']:
         return {
-            'success': False,
-            'celery_status': 'disconnected',
-            'error': str(e)
+            'success': True,
+            'celery_status': 'connected',
+            'worker_response': _celery_health['worker_response'],
+            **status
         }
-
+    return {
+        'success': False,
+        'celery_status': 'disconnected',
+        'error': _celery_health['error'],
+        **status
+    }
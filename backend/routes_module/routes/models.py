@@ -1,17 +1,58 @@
 """
 Model information and status endpoints
 """
-from fastapi import APIRouter, HTTPException
-import os
+from fastapi import APIRouter, HTTPException, Request, Response
+import hashlib
+import orjson
 from schemas.model import ModelInfoResponse
 from router.model_selector import get_model_characteristics
-from routes_module.dependencies import models
+from routes_module.dependencies import models, trained_model_file
+from config import MODEL_FILE_PATHS
 
 router = APIRouter()
 
 
+def _compute_etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _etag_response(request: Request, payload, cache_control: str = 'no-cache',
+                   body: bytes = None, etag: str = None) -> Response:
+    """
+    Serialize payload to JSON with an ETag, answering 304 when the client's copy is current
+    
+    Args:
+        request: Incoming request (checked for If-None-Match)
+        payload: JSON-serializable response content
+        cache_control: Cache-Control header value
+        body: Pre-serialized payload (skips serialization when given with etag)
+        etag: ETag of body
+    
+    Returns:
+        200 response with the JSON body, or an empty 304 response
+    """
+    if body is None:
+        body = orjson.dumps(payload)
+        etag = _compute_etag(body)
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+    
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+# The characteristics are static, so their JSON and ETag are computed once per process
+_CHARACTERISTICS_JSON = orjson.dumps({
+    model_type: characteristics.as_dict()
+    for model_type, characteristics in get_model_characteristics().items()
+})
+_CHARACTERISTICS_ETAG = _compute_etag(_CHARACTERISTICS_JSON)
+
+
 @router.get("/models/status", response_model=ModelInfoResponse)
-async def models_status():
+async def models_status(request: Request):
     """Get status and information about all models"""
     try:
         model_info = {}
@@ -19,21 +60,22 @@ async def models_status():
         
         for model_type, model in models.items():
             # Check if model is trained
-            model_file = f"backend/trained_models/model_{model_type}"
-            model_file += ".keras" if model_type == "tensorflow" else ".pt"
-            is_trained = os.path.exists(model_file)
+            saved_file = trained_model_file(model_type)
+            is_trained = saved_file is not None
+            model_file = saved_file or MODEL_FILE_PATHS[model_type][0]
             
             model_info[model_type] = {
                 "trained": is_trained,
-                "characteristics": characteristics.get(model_type, {}),
+                "characteristics": characteristics[model_type].as_dict(),
                 "model_file": model_file
             }
         
-        return ModelInfoResponse(
+        response = ModelInfoResponse(
             success=True,
             models=model_info,
             message="Model status retrieved successfully"
         )
+        return _etag_response(request, response.model_dump())
     
     except Exception as e:
         raise HTTPException(
@@ -43,7 +85,13 @@ async def models_status():
 
 
 @router.get("/models/characteristics")
-async def get_models_characteristics():
+async def get_models_characteristics(request: Request):
     """Get detailed characteristics of all model types"""
-    return get_model_characteristics()
+    return _etag_response(
+        request,
+        None,
+        cache_control='public, max-age=300',
+        body=_CHARACTERISTICS_JSON,
+        etag=_CHARACTERISTICS_ETAG
+    )
 
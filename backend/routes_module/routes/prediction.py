@@ -1,16 +1,74 @@
 """
 Prediction endpoints
 """
-from fastapi import APIRouter, HTTPException
+from typing import Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
 import numpy as np
-from schemas.predict import PredictRequest, PredictResponse, CompareResponse
-from routes_module.dependencies import models, router as langgraph_router, build_features_dict
+import orjson
+from schemas.predict import (
+    PredictRequest,
+    PredictInput,
+    PredictInputError,
+    PredictResponse,
+    CompareResponse
+)
+from routes_module.dependencies import (
+    models,
+    router as langgraph_router,
+    build_features_array,
+    build_features_dict,
+    features_to_dict,
+    run_predict,
+    run_predict_all
+)
 
-router = APIRouter()
+# orjson encodes the float-heavy prediction payloads much faster than stdlib json
+router = APIRouter(default_response_class=ORJSONResponse)
 
+# Models predict in units of $100,000
+PRICE_SCALE = 100_000.0
 
-@router.post("/predict", response_model=PredictResponse)
-async def predict(request: PredictRequest):
+# (price, formatted price) reported for a model without a saved file
+_NOT_TRAINED = (None, "Not trained")
+
+
+# Bodies are parsed by parse_predict_request, so the schema is documented explicitly
+_PREDICT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": PredictRequest.model_json_schema()}}
+    }
+}
+
+
+async def parse_predict_request(request: Request) -> PredictInput:
+    """Decode and validate a prediction body without building a Pydantic model"""
+    body = await request.body()
+    try:
+        return PredictInput.from_dict(orjson.loads(body))
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError([{
+            'type': 'json_invalid',
+            'loc': ('body', e.pos),
+            'msg': 'JSON decode error',
+            'input': {},
+            'ctx': {'error': e.msg}
+        }])
+    except PredictInputError as e:
+        raise RequestValidationError(e.errors)
+
+
+def _price_pair(prediction: float) -> Tuple[float, str]:
+    """Convert a model prediction to dollars, rounded and formatted"""
+    price_dollars = prediction * PRICE_SCALE
+    return round(price_dollars, 2), f"${price_dollars:,.2f}"
+
+
+@router.post("/predict", responses={200: {"model": PredictResponse}},
+             openapi_extra=_PREDICT_REQUEST_BODY)
+async def predict(request: PredictInput = Depends(parse_predict_request)):
     """
     Predict house price using LangGraph routing
     
@@ -18,8 +76,8 @@ async def predict(request: PredictRequest):
     or you can specify a model explicitly.
     """
     try:
-        # Build features dictionary
-        features = build_features_dict(request)
+        # Build the model input vector
+        features = build_features_array(request)
         
         # Use LangGraph router to select model
         routing_result = langgraph_router.route(
@@ -32,47 +90,48 @@ async def predict(request: PredictRequest):
         
         # Handle ensemble
         if selected_model == 'ensemble':
-            predictions = {}
-            for model_type, model in models.items():
-                try:
-                    pred = model.predict(features)
-                    predictions[model_type] = pred
-                except Exception as e:
-                    print(f"Error with {model_type}: {e}")
+            # Prices in dollars are written in place; the first k slots are valid
+            buf = np.empty(len(models), dtype=np.float64)
+            ensemble_predictions = {}
+            k = 0
+            for model_type, pred in (await run_predict_all(features)).items():
+                if isinstance(pred, Exception):
+                    print(f"Error with {model_type}: {pred}")
+                    continue
+                ensemble_predictions[model_type] = buf[k] = pred * PRICE_SCALE
+                k += 1
             
-            if not predictions:
+            if k == 0:
                 raise HTTPException(
                     status_code=404,
                     detail="No trained models available for ensemble"
                 )
             
             # Average predictions
-            avg_prediction = np.mean(list(predictions.values()))
-            price_dollars = avg_prediction * 100000
+            price_dollars = float(buf[:k].mean())
             
-            return PredictResponse(
-                success=True,
-                predicted_price=round(price_dollars, 2),
-                predicted_price_formatted=f"${price_dollars:,.2f}",
-                model_used="ensemble",
-                routing_explanation=routing_result['explanation'],
-                features_used=features,
-                ensemble_predictions={k: v * 100000 for k, v in predictions.items()}
-            )
+            return ORJSONResponse({
+                'success': True,
+                'predicted_price': round(price_dollars, 2),
+                'predicted_price_formatted': f"${price_dollars:,.2f}",
+                'model_used': "ensemble",
+                'routing_explanation': routing_result['explanation'],
+                'features_used': features_to_dict(features),
+                'ensemble_predictions': ensemble_predictions
+            })
         else:
             # Single model prediction
             model = models[selected_model]
-            predicted_price = model.predict(features)
-            price_dollars = predicted_price * 100000
+            price, price_formatted = _price_pair(await run_predict(model, features))
             
-            return PredictResponse(
-                success=True,
-                predicted_price=round(price_dollars, 2),
-                predicted_price_formatted=f"${price_dollars:,.2f}",
-                model_used=selected_model,
-                routing_explanation=routing_result['explanation'],
-                features_used=features
-            )
+            return ORJSONResponse({
+                'success': True,
+                'predicted_price': price,
+                'predicted_price_formatted': price_formatted,
+                'model_used': selected_model,
+                'routing_explanation': routing_result['explanation'],
+                'features_used': features_to_dict(features)
+            })
     
     except FileNotFoundError:
         raise HTTPException(
@@ -87,38 +146,69 @@ async def predict(request: PredictRequest):
         )
 
 
-@router.post("/predict/compare", response_model=CompareResponse)
-async def predict_compare(request: PredictRequest):
+@router.post("/predict/debug", openapi_extra=_PREDICT_REQUEST_BODY)
+async def predict_debug(request: PredictInput = Depends(parse_predict_request)):
     """
-    Get predictions from all available models for comparison
+    Run the full LangGraph routing graph for a request without predicting
+    
+    /predict makes the same decision with direct calls; this endpoint
+    exercises the graph itself for inspection and debugging.
     """
     try:
         features = build_features_dict(request)
         
+        return langgraph_router.debug_route(
+            features=features,
+            model_preference=request.model_preference,
+            criteria=request.criteria
+        )
+    
+    except Exception as e:
+        print(f"Routing debug error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Routing failed: {str(e)}"
+        )
+
+
+@router.post("/predict/compare", responses={200: {"model": CompareResponse}},
+             openapi_extra=_PREDICT_REQUEST_BODY)
+async def predict_compare(request: PredictInput = Depends(parse_predict_request)):
+    """
+    Get predictions from all available models for comparison
+    """
+    try:
+        features = build_features_array(request)
+        
         predictions = {}
         predictions_formatted = {}
+        # Rounded prices of the available models; the first k slots are valid
+        buf = np.empty(len(models), dtype=np.float64)
+        k = 0
         
-        for model_type, model in models.items():
-            try:
-                pred = model.predict(features)
-                price_dollars = pred * 100000
-                predictions[model_type] = round(price_dollars, 2)
-                predictions_formatted[model_type] = f"${price_dollars:,.2f}"
-            except FileNotFoundError:
-                predictions[model_type] = None
-                predictions_formatted[model_type] = "Not trained"
+        for model_type, pred in (await run_predict_all(features)).items():
+            if isinstance(pred, FileNotFoundError):
+                price, price_formatted = _NOT_TRAINED
+            elif isinstance(pred, Exception):
+                raise pred
+            else:
+                price, price_formatted = _price_pair(pred)
+                buf[k] = price
+                k += 1
+            
+            predictions[model_type] = price
+            predictions_formatted[model_type] = price_formatted
         
         # Calculate average of available predictions
-        available_preds = [p for p in predictions.values() if p is not None]
-        avg_prediction = np.mean(available_preds) if available_preds else 0
+        avg_prediction = float(buf[:k].mean()) if k else 0
         
-        return CompareResponse(
-            success=True,
-            predictions=predictions,
-            predictions_formatted=predictions_formatted,
-            average_prediction=round(avg_prediction, 2),
-            features_used=features
-        )
+        return ORJSONResponse({
+            'success': True,
+            'predictions': predictions,
+            'predictions_formatted': predictions_formatted,
+            'average_prediction': round(avg_prediction, 2),
+            'features_used': features_to_dict(features)
+        })
     
     except Exception as e:
         print(f"Comparison error: {str(e)}")
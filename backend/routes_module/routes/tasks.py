@@ -1,16 +1,163 @@
 """
 Asynchronous task status and result endpoints
 """
-from fastapi import APIRouter, HTTPException
-from celery.result import AsyncResult
-from schemas.task import TaskStatusResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from celery.result import result_from_tuple
+from celery import states
+import orjson
+from typing import Optional
+from schemas.task import TaskStatusResponse, GroupStatusResponse
 from celery_config import celery_app
+from config import PROGRESS_CHANNEL_TEMPLATE, TASK_GROUP_KEY_TEMPLATE
 
-router = APIRouter()
+# Status payloads (which can carry long loss histories) are built as plain
+# dicts and encoded with orjson; the schemas below only document them
+router = APIRouter(default_response_class=ORJSONResponse)
 
+# The backend is only used to build keys and decode stored metas; the reads
+# themselves go through the async Redis client
+_backend = celery_app.backend
 
-@router.get("/task/{task_id}/status", response_model=TaskStatusResponse)
-async def get_task_status(task_id: str):
+# Seconds without a progress event before re-checking the result backend
+STREAM_IDLE_TIMEOUT = 15.0
+
+# Progress reported for states that carry no progress info of their own
+# (shared between responses; never mutated)
+_STATE_PROGRESS = {
+    'PENDING': {
+        'current': 0,
+        'total': 100,
+        'percent': 0,
+        'message': 'Task is waiting to start...'
+    },
+    'STARTED': {
+        'current': 0,
+        'total': 100,
+        'percent': 0,
+        'message': 'Task has started...'
+    },
+    'SUCCESS': {
+        'current': 100,
+        'total': 100,
+        'percent': 100,
+        'message': 'Training completed successfully!'
+    },
+    'FAILURE': {
+        'current': 0,
+        'total': 100,
+        'percent': 0,
+        'message': 'Training failed'
+    }
+}
+
+
+async def read_task_meta(redis_client, task_id: str) -> dict:
+    """
+    Read a task's entry from the result backend without blocking the event loop
+    
+    Args:
+        redis_client: redis.asyncio client (app.state.redis)
+        task_id: Celery task id
+    
+    Returns:
+        Decoded task meta with 'status' and 'result' keys
+    """
+    raw = await redis_client.get(_backend.get_key_for_task(task_id))
+    if raw is None:
+        # Nothing stored yet: the task is unknown or still queued
+        return {'task_id': task_id, 'status': states.PENDING, 'result': None}
+    return _backend.decode_result(raw)
+
+
+async def _read_group_task_ids(redis_client, group_id: str) -> Optional[list]:
+    """
+    Read the ids of a saved group's tasks without blocking the event loop
+    
+    Returns:
+        Child task ids, or None if the group was never saved
+    """
+    raw = await redis_client.get(_backend.get_key_for_group(group_id))
+    if raw is None:
+        return None
+    group_result = result_from_tuple(_backend.decode(raw)['result'], celery_app)
+    return [child.id for child in group_result.children]
+
+
+async def _read_task_metas(redis_client, task_ids: list) -> list:
+    """Read many tasks' result-backend entries in one round trip"""
+    if not task_ids:
+        return []
+    keys = [_backend.get_key_for_task(task_id) for task_id in task_ids]
+    values = await redis_client.mget(keys)
+    return [
+        _backend.decode_result(raw) if raw is not None
+        else {'task_id': task_id, 'status': states.PENDING, 'result': None}
+        for task_id, raw in zip(task_ids, values)
+    ]
+
+
+async def _group_progress(redis_client, task_id: str) -> Optional[dict]:
+    """
+    Combined progress of the per-model tasks a "train all" callback waits on
+    
+    The chord callback stays PENDING until every model has finished, while
+    the epoch progress is reported by the per-model tasks themselves.
+    
+    Returns:
+        Progress info averaged over the group's tasks, or None if task_id is
+        not a "train all" callback
+    """
+    group_id = await redis_client.get(TASK_GROUP_KEY_TEMPLATE.format(task_id=task_id))
+    if group_id is None:
+        return None
+    task_ids = await _read_group_task_ids(redis_client, group_id.decode())
+    if not task_ids:
+        return None
+    
+    metas = await _read_task_metas(redis_client, task_ids)
+    percents = []
+    messages = []
+    for meta in metas:
+        if meta['status'] == 'PROGRESS':
+            percents.append(meta['result']['percent'])
+            messages.append(meta['result']['message'])
+        else:
+            percents.append(100 if meta['status'] == states.SUCCESS else 0)
+    
+    completed = sum(meta['status'] == states.SUCCESS for meta in metas)
+    percent = sum(percents) // len(percents)
+    return {
+        'current': percent,
+        'total': 100,
+        'percent': percent,
+        'message': '; '.join(messages) or f'{completed}/{len(metas)} models trained'
+    }
+
+
+def _build_task_status(task_id: str, meta: dict) -> dict:
+    """Build the status payload for a single task from its result-backend meta"""
+    state = meta['status']
+    info = meta.get('result')
+    response = {
+        'task_id': task_id,
+        'state': state,
+        'progress': info if state == 'PROGRESS' else _STATE_PROGRESS.get(state),
+        'result': None,
+        'error': None
+    }
+    
+    if state == 'SUCCESS':
+        response['result'] = info
+    
+    elif state == 'FAILURE':
+        response['error'] = str(info) if info else 'Unknown error'
+    
+    return response
+
+
+@router.get("/task/{task_id}/status", responses={200: {"model": TaskStatusResponse}})
+async def get_task_status(task_id: str, request: Request):
     """
     Get the status of an asynchronous task
     
@@ -24,55 +171,17 @@ async def get_task_status(task_id: str):
         - FAILURE: Task failed with error
     """
     try:
-        task_result = AsyncResult(task_id, app=celery_app)
+        meta = await read_task_meta(request.app.state.redis, task_id)
+        response = _build_task_status(task_id, meta)
         
-        response = {
-            'task_id': task_id,
-            'state': task_result.state,
-            'progress': None,
-            'result': None,
-            'error': None
-        }
-        
-        if task_result.state == 'PENDING':
-            response['progress'] = {
-                'current': 0,
-                'total': 100,
-                'percent': 0,
-                'message': 'Task is waiting to start...'
-            }
-        
-        elif task_result.state == 'STARTED':
-            response['progress'] = {
-                'current': 0,
-                'total': 100,
-                'percent': 0,
-                'message': 'Task has started...'
-            }
+        if meta['status'] == states.PENDING:
+            # A "train all" callback: report its models' progress instead
+            progress = await _group_progress(request.app.state.redis, task_id)
+            if progress is not None:
+                response['state'] = 'PROGRESS'
+                response['progress'] = progress
         
-        elif task_result.state == 'PROGRESS':
-            response['progress'] = task_result.info
-        
-        elif task_result.state == 'SUCCESS':
-            response['result'] = task_result.result
-            response['progress'] = {
-                'current': 100,
-                'total': 100,
-                'percent': 100,
-                'message': 'Training completed successfully!'
-            }
-        
-        elif task_result.state == 'FAILURE':
-            error_info = task_result.info
-            response['error'] = str(error_info) if error_info else 'Unknown error'
-            response['progress'] = {
-                'current': 0,
-                'total': 100,
-                'percent': 0,
-                'message': 'Training failed'
-            }
-        
-        return TaskStatusResponse(**response)
+        return ORJSONResponse(response)
     
     except Exception as e:
         print(f"Error getting task status: {str(e)}")
@@ -82,8 +191,103 @@ async def get_task_status(task_id: str):
         )
 
 
+@router.get("/task/{task_id}/stream")
+async def stream_task_progress(task_id: str, request: Request):
+    """
+    Stream progress of an asynchronous task as Server-Sent Events
+    
+    Pushes each progress update as it is published by the worker instead
+    of requiring the client to poll /task/{task_id}/status. Every event is
+    a JSON object; the final event has the same shape as the status
+    endpoint response and the stream closes after it.
+    """
+    return StreamingResponse(
+        _progress_events(task_id, request.app.state.redis),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+async def _progress_events(task_id: str, redis_client):
+    """Yield SSE-formatted progress events until the task is finished"""
+    # Subscribes through the app's Redis client, which the lifespan closes
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(PROGRESS_CHANNEL_TEMPLATE.format(task_id=task_id))
+    
+    try:
+        # A task that finished before we subscribed goes straight to the final event
+        meta = await read_task_meta(redis_client, task_id)
+        if meta['status'] not in states.READY_STATES:
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=STREAM_IDLE_TIMEOUT
+                )
+                if message is None:
+                    # Guard against a missed terminal event before waiting again
+                    meta = await read_task_meta(redis_client, task_id)
+                    if meta['status'] in states.READY_STATES:
+                        break
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                event = orjson.loads(message['data'])
+                if event['state'] != 'PROGRESS':
+                    break
+                yield _sse_event(event)
+        
+        meta = await read_task_meta(redis_client, task_id)
+        yield _sse_event(_build_task_status(task_id, meta))
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.reset()
+
+
+def _sse_event(payload: dict) -> str:
+    """Format a payload as a Server-Sent Event"""
+    return f"data: {orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()}\n\n"
+
+
+@router.get("/task/group/{group_id}/status", responses={200: {"model": GroupStatusResponse}})
+async def get_group_status(group_id: str, request: Request):
+    """
+    Get the status of every task in a training group
+    
+    Used to follow the per-model progress of a "train all" submission,
+    whose models are trained concurrently.
+    """
+    task_ids = await _read_group_task_ids(request.app.state.redis, group_id)
+    
+    if task_ids is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Task group {group_id} not found"
+        )
+    
+    try:
+        metas = await _read_task_metas(request.app.state.redis, task_ids)
+        task_states = [meta['status'] for meta in metas]
+        
+        return ORJSONResponse({
+            'group_id': group_id,
+            'completed': sum(state == states.SUCCESS for state in task_states),
+            'total': len(task_ids),
+            'ready': all(state in states.READY_STATES for state in task_states),
+            'successful': all(state == states.SUCCESS for state in task_states),
+            'tasks': [_build_task_status(task_id, meta) for task_id, meta in zip(task_ids, metas)]
+        })
+    
+    except Exception as e:
+        print(f"Error getting group status: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get group status: {str(e)}"
+        )
+
+
 @router.get("/task/{task_id}/result")
-async def get_task_result(task_id: str):
+async def get_task_result(task_id: str, request: Request):
     """
     Get the result of a completed task
     
@@ -91,25 +295,26 @@ async def get_task_result(task_id: str):
     otherwise returns status information
     """
     try:
-        task_result = AsyncResult(task_id, app=celery_app)
+        meta = await read_task_meta(request.app.state.redis, task_id)
+        state = meta['status']
         
-        if task_result.state == 'SUCCESS':
+        if state == 'SUCCESS':
             return {
                 'success': True,
                 'state': 'SUCCESS',
-                'result': task_result.result
+                'result': meta['result']
             }
-        elif task_result.state == 'FAILURE':
+        elif state == 'FAILURE':
             return {
                 'success': False,
                 'state': 'FAILURE',
-                'error': str(task_result.info)
+                'error': str(meta['result'])
             }
         else:
             return {
                 'success': False,
-                'state': task_result.state,
-                'message': f'Task is not yet completed. Current state: {task_result.state}'
+                'state': state,
+                'message': f'Task is not yet completed. Current state: {state}'
             }
     
     except Exception as e:
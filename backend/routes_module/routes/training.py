@@ -1,18 +1,113 @@
 """
 Model training endpoints
 """
-from fastapi import APIRouter, HTTPException
-from typing import Literal
+import asyncio
+import hashlib
+import logging
+import orjson
+import os
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import Literal, Optional
 from schemas.train import TrainRequest, TrainResponse, AsyncTrainResponse
-from routes_module.dependencies import models
-from celery_worker import train_model_async
+from routes_module.dependencies import models, predictors, invalidate_trained_cache
+from services.training_service import HousePriceModel
+from celery import states
+from celery_worker import train_model_async, build_train_all_workflow
+from routes_module.routes.tasks import read_task_meta
+from config import TRAIN_DEDUP_TTL, TRAIN_DEDUP_CLAIM_TTL, TASK_GROUP_KEY_TEMPLATE, CELERY_CONFIG
 
-router = APIRouter()
+# Responses are built as plain dicts and encoded with orjson; the schemas
+# below are only OpenAPI documentation, so nothing is re-validated
+router = APIRouter(default_response_class=ORJSONResponse)
 
+logger = logging.getLogger(__name__)
 
-@router.post("/train/{model_type}", response_model=TrainResponse)
+# Built once; validates request bodies straight from JSON bytes
+_TRAIN_ADAPTER = TypeAdapter(TrainRequest)
+
+# The body is read by parse_train_request, so its schema is documented explicitly
+_TRAIN_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": TrainRequest.model_json_schema()}}
+    }
+}
+
+
+async def parse_train_request(request: Request) -> TrainRequest:
+    """Validate the JSON body as a TrainRequest without an intermediate dict"""
+    try:
+        return _TRAIN_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+
+def _hidden_sizes(request: TrainRequest) -> Optional[list]:
+    """Requested hidden layer sizes; None (explicit null) leaves the default architecture"""
+    return list(request.hidden_sizes) if request.hidden_sizes is not None else None
+
+
+# One training run per model at a time; different models may train concurrently
+_TRAINING_LOCKS = {model_type: asyncio.Lock() for model_type in models}
+
+
+async def _train_in_thread(model_type: str, request: TrainRequest,
+                           threads: Optional[int] = None) -> dict:
+    """
+    Train one model in a worker thread so the event loop keeps serving requests
+    
+    A fresh HousePriceModel is trained and swapped in only once it is done;
+    the serving instance keeps answering predictions throughout, since
+    train_model replaces its network and scalers before training starts.
+    threads caps the framework threads the training uses (see train_model).
+    """
+    async with _TRAINING_LOCKS[model_type]:
+        logger.info("Training %s model...", model_type)
+        trained = HousePriceModel(model_type=model_type)
+        metrics = await asyncio.to_thread(
+            trained.train_model,
+            epochs=request.epochs,
+            learning_rate=request.learning_rate,
+            hidden_sizes=_hidden_sizes(request),
+            save=False,
+            threads=threads
+        )
+        models[model_type] = trained
+        predictors[model_type].model = trained
+        return metrics
+
+
+def _dedup_key(model_type: str, request: TrainRequest) -> str:
+    """Redis key identifying an async training submission by its parameters"""
+    params = f"{model_type}|{request.epochs}|{request.learning_rate}|{request.hidden_sizes}"
+    return f"train-dedup:{hashlib.sha256(params.encode()).hexdigest()}"
+
+
+# Replace a finished submission's entry with a fresh claim, atomically and only
+# if no other request has replaced it since it was read
+_RECLAIM_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return false
+"""
+
+
+async def _persist_model(model_type: str) -> None:
+    """Save a freshly trained model to disk (run after the response is sent)"""
+    async with _TRAINING_LOCKS[model_type]:
+        await asyncio.to_thread(models[model_type].save_model)
+    invalidate_trained_cache(model_type)
+
+
+@router.post("/train/{model_type}", responses={200: {"model": TrainResponse}},
+             openapi_extra=_TRAIN_REQUEST_BODY)
 async def train(model_type: Literal['tensorflow', 'pytorch', 'xgboost', 'all'], 
-                request: TrainRequest):
+                background_tasks: BackgroundTasks,
+                request: TrainRequest = Depends(parse_train_request)):
     """
     Train a specific model or all models
     
@@ -23,58 +118,61 @@ async def train(model_type: Literal['tensorflow', 'pytorch', 'xgboost', 'all'],
         - epochs: number of training epochs (default: 500)
         - learning_rate: learning rate for training (default: 0.001)
         - hidden_sizes: list of hidden layer sizes (default: [64, 32, 16])
+    
+    The trained models serve predictions immediately; they are saved to
+    disk after the response is sent.
     """
     try:
         if model_type == 'all':
-            # Train all models
-            results = {}
-            for mt in ['tensorflow', 'pytorch', 'xgboost']:
-                print(f"Training {mt} model...")
-                model = models[mt]
-                metrics = model.train_model(
-                    epochs=request.epochs,
-                    learning_rate=request.learning_rate,
-                    hidden_sizes=request.hidden_sizes
-                )
-                results[mt] = metrics
+            # Train all models concurrently, splitting the CPUs between them
+            # instead of each framework sizing its pools to every core
+            model_types = ['tensorflow', 'pytorch', 'xgboost']
+            threads = max(1, (os.cpu_count() or 1) // len(model_types))
+            results = dict(zip(model_types, await asyncio.gather(
+                *(_train_in_thread(mt, request, threads) for mt in model_types)
+            )))
             
-            return TrainResponse(
-                success=True,
-                message="All models trained successfully",
-                model_type="all",
-                metrics=results
-            )
+            for mt in model_types:
+                background_tasks.add_task(_persist_model, mt)
+            
+            return ORJSONResponse({
+                'success': True,
+                'message': "All models trained successfully",
+                'model_type': "all",
+                'metrics': results
+            })
         else:
             # Train specific model
-            model = models[model_type]
-            metrics = model.train_model(
-                epochs=request.epochs,
-                learning_rate=request.learning_rate,
-                hidden_sizes=request.hidden_sizes
-            )
+            metrics = await _train_in_thread(model_type, request)
             
-            return TrainResponse(
-                success=True,
-                message=f"{model_type.upper()} model trained successfully",
-                model_type=model_type,
-                metrics=metrics
-            )
+            background_tasks.add_task(_persist_model, model_type)
+            
+            return ORJSONResponse({
+                'success': True,
+                'message': f"{model_type.upper()} model trained successfully",
+                'model_type': model_type,
+                'metrics': metrics
+            })
     
     except Exception as e:
-        print(f"Training error: {str(e)}")
+        logger.exception("Training error")
         raise HTTPException(
             status_code=500,
             detail=f"Training failed: {str(e)}"
         )
 
 
-@router.post("/train/{model_type}/async", response_model=AsyncTrainResponse)
+@router.post("/train/{model_type}/async", responses={200: {"model": AsyncTrainResponse}},
+             openapi_extra=_TRAIN_REQUEST_BODY)
 async def train_async(model_type: Literal['tensorflow', 'pytorch', 'xgboost', 'all'], 
-                      request: TrainRequest):
+                      http_request: Request,
+                      request: TrainRequest = Depends(parse_train_request)):
     """
     Submit asynchronous training task for a specific model or all models
     
-    Returns immediately with a task_id that can be used to check status
+    Returns immediately with a task_id that can be used to check status.
+    For 'all', the models train concurrently and group_id can be used to
+    check the progress of each model individually.
     
     Path parameter:
         model_type: tensorflow, pytorch, xgboost, or all
@@ -83,22 +181,90 @@ async def train_async(model_type: Literal['tensorflow', 'pytorch', 'xgboost', 'a
         - epochs: number of training epochs (default: 500)
         - learning_rate: learning rate for training (default: 0.001)
         - hidden_sizes: list of hidden layer sizes (default: [64, 32, 16])
+    
+    An identical submission (same model type and parameters) made while the
+    earlier task is still unfinished returns that task instead of training
+    again; once it has finished (or failed), the model is trained again.
     """
+    redis_client = http_request.app.state.redis
+    dedup_key = _dedup_key(model_type, request)
+    
+    # Claim the submission briefly; the claim is replaced by the task ids (and
+    # the full TTL) once submitted, so a crashed submission can't block retries
+    claimed = await redis_client.set(dedup_key, b'', nx=True, ex=TRAIN_DEDUP_CLAIM_TTL)
+    if not claimed:
+        stored = await redis_client.get(dedup_key)
+        if stored:
+            submitted = orjson.loads(stored)
+            meta = await read_task_meta(redis_client, submitted['task_id'])
+            if meta['status'] not in states.READY_STATES:
+                return ORJSONResponse({
+                    'success': True,
+                    'task_id': submitted['task_id'],
+                    'message': f"Identical training task already submitted for {model_type}",
+                    'model_type': model_type,
+                    'group_id': submitted['group_id']
+                })
+            # The identical task already finished or failed: claim the key and train again
+            claimed = await redis_client.eval(
+                _RECLAIM_SCRIPT, 1, dedup_key, stored, b'', TRAIN_DEDUP_CLAIM_TTL
+            )
+        if not claimed:
+            raise HTTPException(
+                status_code=409,
+                detail=f"An identical training submission for {model_type} is in progress"
+            )
+    
     try:
-        # Submit task to Celery
-        task = train_model_async.apply_async(
-            args=[model_type, request.epochs, request.learning_rate, request.hidden_sizes]
-        )
+        group_id = None
+        hidden_sizes = _hidden_sizes(request)
+        # Publish through the app's long-lived producer (see app lifespan)
+        producer = http_request.app.state.celery_producer
+        
+        if model_type == 'all':
+            # Fan out one task per model; task_id tracks the merged chord result
+            task = build_train_all_workflow(
+                request.epochs, request.learning_rate, hidden_sizes
+            ).apply_async(producer=producer)
+            task.parent.save()
+            group_id = task.parent.id
+            # Lets /task/{task_id}/status report the group's progress while the
+            # callback waits for every model to finish
+            await redis_client.set(
+                TASK_GROUP_KEY_TEMPLATE.format(task_id=task.id),
+                group_id,
+                ex=CELERY_CONFIG['result_expires']
+            )
+        else:
+            # Submit task to Celery
+            task = train_model_async.apply_async(
+                args=[model_type, request.epochs, request.learning_rate, hidden_sizes],
+                producer=producer
+            )
         
-        return AsyncTrainResponse(
-            success=True,
-            task_id=task.id,
-            message=f"Training task submitted for {model_type}",
-            model_type=model_type
+        await redis_client.set(
+            dedup_key,
+            orjson.dumps({'task_id': task.id, 'group_id': group_id}),
+            ex=TRAIN_DEDUP_TTL
         )
+        
+        return ORJSONResponse({
+            'success': True,
+            'task_id': task.id,
+            'message': f"Training task submitted for {model_type}",
+            'model_type': model_type,
+            'group_id': group_id
+        })
+    
+    except asyncio.CancelledError:
+        # Client went away mid-submission: release the claim and stop
+        await redis_client.delete(dedup_key)
+        raise
     
     except Exception as e:
-        print(f"Error submitting training task: {str(e)}")
+        # Release the claim so the submission can be retried
+        await redis_client.delete(dedup_key)
+        logger.exception("Error submitting training task")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to submit training task: {str(e)}"
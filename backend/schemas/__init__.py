@@ -3,8 +3,8 @@ Pydantic schemas for API request/response validation
 """
 from .health import HealthResponse
 from .train import TrainRequest, TrainResponse, AsyncTrainResponse
-from .predict import PredictRequest, PredictResponse, CompareResponse
-from .task import TaskStatusResponse
+from .predict import PredictRequest, PredictInput, PredictResponse, CompareResponse
+from .task import TaskStatusResponse, GroupStatusResponse
 from .model import ModelInfoResponse
 
 __all__ = [
@@ -13,9 +13,11 @@ __all__ = [
     'TrainResponse',
     'AsyncTrainResponse',
     'PredictRequest',
+    'PredictInput',
     'PredictResponse',
     'CompareResponse',
     'TaskStatusResponse',
+    'GroupStatusResponse',
     'ModelInfoResponse',
 ]
 
@@ -1,6 +1,7 @@
 """Prediction-related schemas"""
+from dataclasses import dataclass
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 
 class PredictRequest(BaseModel):
@@ -18,6 +19,101 @@ class PredictRequest(BaseModel):
     criteria: Optional[Dict] = Field(default=None, description="Criteria for auto model selection")
 
 
+@dataclass(frozen=True, slots=True)
+class PredictInput:
+    """
+    Parsed prediction request body
+    
+    The request path parses bodies into this instead of PredictRequest, which
+    only documents the schema; fields and defaults must match PredictRequest.
+    """
+    sqft: float
+    bedrooms: float
+    bathrooms: float
+    latitude: float
+    longitude: float
+    median_income: float = 3.5
+    house_age: float = 25.0
+    population: float = 1500.0
+    model_preference: str = "auto"
+    criteria: Optional[Dict] = None
+    
+    @classmethod
+    def from_dict(cls, data) -> "PredictInput":
+        """
+        Validate a decoded JSON body
+        
+        Numbers must be JSON numbers; null or missing optional fields take
+        their defaults and unknown keys are ignored.
+        
+        Raises:
+            PredictInputError: with every problem found, in FastAPI's
+                validation-error format
+        """
+        if not isinstance(data, dict):
+            raise PredictInputError([_error('dict_type', (), 'Input should be a valid dictionary', data)])
+        
+        errors = []
+        values = {}
+        for name in _REQUIRED_NUMBERS:
+            value = data.get(name)
+            if value is None:
+                errors.append(_error('missing', (name,), 'Field required', data))
+            elif _is_number(value):
+                values[name] = float(value)
+            else:
+                errors.append(_error('float_type', (name,), 'Input should be a valid number', value))
+        
+        for name in _OPTIONAL_NUMBERS:
+            value = data.get(name)
+            if value is None:
+                continue
+            if _is_number(value):
+                values[name] = float(value)
+            else:
+                errors.append(_error('float_type', (name,), 'Input should be a valid number', value))
+        
+        model_preference = data.get('model_preference')
+        if model_preference is not None:
+            if isinstance(model_preference, str):
+                values['model_preference'] = model_preference
+            else:
+                errors.append(_error('string_type', ('model_preference',), 'Input should be a valid string', model_preference))
+        
+        criteria = data.get('criteria')
+        if criteria is not None:
+            if isinstance(criteria, dict):
+                values['criteria'] = criteria
+            else:
+                errors.append(_error('dict_type', ('criteria',), 'Input should be a valid dictionary', criteria))
+        
+        if errors:
+            raise PredictInputError(errors)
+        return cls(**values)
+
+
+class PredictInputError(ValueError):
+    """Invalid prediction request body; errors use FastAPI's validation-error format"""
+    
+    def __init__(self, errors: List[dict]):
+        super().__init__(errors)
+        self.errors = errors
+
+
+_REQUIRED_NUMBERS = ('sqft', 'bedrooms', 'bathrooms', 'latitude', 'longitude')
+_OPTIONAL_NUMBERS = ('median_income', 'house_age', 'population')
+
+
+def _is_number(value) -> bool:
+    """JSON number (bool is an int subclass but not a number here)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _error(error_type: str, loc: tuple, msg: str, value) -> dict:
+    """One validation error entry located in the request body"""
+    return {'type': error_type, 'loc': ('body', *loc), 'msg': msg, 'input': value}
+
+
 class PredictResponse(BaseModel):
     model_config = ConfigDict(protected_namespaces=())
     
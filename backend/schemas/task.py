@@ -1,6 +1,6 @@
 """Task status schemas"""
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 
 class TaskStatusResponse(BaseModel):
@@ -10,3 +10,11 @@ class TaskStatusResponse(BaseModel):
     result: Optional[dict] = None
     error: Optional[str] = None
 
+
+class GroupStatusResponse(BaseModel):
+    group_id: str
+    completed: int
+    total: int
+    ready: bool
+    successful: bool
+    tasks: List[TaskStatusResponse]
@@ -1,12 +1,19 @@
 """Training-related schemas"""
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict, PositiveInt
+from typing import Optional, Tuple
 
 
 class TrainRequest(BaseModel):
-    epochs: Optional[int] = Field(default=500, description="Number of training epochs")
-    learning_rate: Optional[float] = Field(default=0.001, description="Learning rate for training")
-    hidden_sizes: Optional[List[int]] = Field(default=[64, 32, 16], description="Hidden layer sizes")
+    # Bounded fields reject nonsense early and keep hidden_sizes validation short
+    epochs: int = Field(default=500, gt=0, le=100_000, description="Number of training epochs")
+    learning_rate: float = Field(default=0.001, gt=0, lt=1, description="Learning rate for training")
+    # Immutable default: shared by every request instead of copied per instance
+    hidden_sizes: Optional[Tuple[PositiveInt, ...]] = Field(
+        default=(64, 32, 16),
+        min_length=1,
+        max_length=8,
+        description="Hidden layer sizes (1 to 8 layers)"
+    )
 
 
 class TrainResponse(BaseModel):
@@ -25,4 +32,5 @@ class AsyncTrainResponse(BaseModel):
     task_id: str
     message: str
     model_type: str
+    group_id: Optional[str] = None
 
@@ -2,6 +2,7 @@
 Services module for business logic
 """
 from .training_service import HousePriceModel, train_all_models
+from .batching_predictor import BatchingPredictor
 
-__all__ = ['HousePriceModel', 'train_all_models']
+__all__ = ['HousePriceModel', 'train_all_models', 'BatchingPredictor']
 
@@ -0,0 +1,99 @@
+"""
+Micro-batching of concurrent prediction requests
+Groups requests that arrive close together into a single model call
+"""
+import asyncio
+import contextlib
+from concurrent.futures import Executor
+
+
+class BatchingPredictor:
+    """
+    Collects concurrent predictions for one model into batches
+    
+    Requests submitted within max_wait_ms of the first queued request (up to
+    max_batch of them) are stacked and scored with one predict_batch call in
+    the given executor, so the model runs once per batch instead of once per
+    request. The queue is bounded to apply backpressure under overload.
+    """
+    
+    def __init__(self, model, executor: Executor, max_batch: int = 64,
+                 max_wait_ms: float = 10, max_queue: int = 1024):
+        """
+        Initialize the batching predictor
+        
+        Args:
+            model: HousePriceModel used to score batches
+            executor: Executor that runs the blocking predict_batch call
+            max_batch: Maximum number of requests scored together
+            max_wait_ms: How long to wait for more requests after the first one
+            max_queue: Maximum number of queued requests before submit() waits
+        """
+        self.model = model
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._queue = None
+        self._worker = None
+    
+    async def submit(self, features) -> float:
+        """
+        Queue one prediction and wait for its result
+        
+        Args:
+            features: Feature dictionary for one house
+        
+        Returns:
+            Predicted house price
+        """
+        if self._worker is None:
+            # Created lazily so they bind to the running event loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+    
+    async def stop(self) -> None:
+        """Stop the batching loop"""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+    
+    async def _run(self) -> None:
+        """Drain the queue into batches and score them"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                prices = await loop.run_in_executor(
+                    self.executor,
+                    self.model.predict_batch,
+                    [features for features, _ in batch]
+                )
+            except Exception as e:
+                # e.g. FileNotFoundError for an untrained model: fail every request
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), price in zip(batch, prices):
+                if not future.done():
+                    future.set_result(float(price))
@@ -6,16 +6,58 @@ import numpy as np
 from sklearn.datasets import fetch_california_housing
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+import base64
+import copy
+import hashlib
+import logging
+import multiprocessing
 import pickle
 import os
-from typing import Literal, Optional
-from models.tensorflow_model import TensorFlowModel
-from models.pytorch_model import PyTorchModel
-from models.xgboost_model import XGBoostModel
-from models.base_model import calculate_r2_score
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Literal, Optional, Tuple
+from models.base_model import BaseHousingModel, calculate_r2_score
+from config import MODEL_FILE_EXTENSIONS, FEATURE_ORDER, DEFAULT_HIDDEN_SIZES
+
+# Values used for features missing from a prediction dictionary
+FEATURE_DEFAULTS = {
+    'MedInc': 3.0,
+    'HouseAge': 25.0,
+    'AveRooms': 5.0,
+    'AveBedrms': 1.0,
+    'Population': 1500.0,
+    'AveOccup': 3.0,
+    'Latitude': 35.0,
+    'Longitude': -120.0
+}
 
 ModelType = Literal['tensorflow', 'pytorch', 'xgboost']
 
+logger = logging.getLogger(__name__)
+
+# Fitted (scaler_X, scaler_y) per training dataset, keyed by _dataset_key
+_SCALER_CACHE: Dict[str, Tuple[StandardScaler, StandardScaler]] = {}
+
+
+@lru_cache(maxsize=1)
+def _load_california_housing():
+    """
+    Load the California housing dataset once per process
+    
+    Returns:
+        Tuple of (X, y as a column, feature names); treat the arrays as read-only
+    """
+    housing = fetch_california_housing()
+    return housing.data, housing.target.reshape(-1, 1), list(housing.feature_names)
+
+
+def _dataset_key(X: np.ndarray, y: np.ndarray) -> str:
+    """Content hash identifying a training dataset"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
 
 class HousePriceModel:
     """Wrapper class for house price prediction supporting multiple model types"""
@@ -32,50 +74,107 @@ class HousePriceModel:
         self.scaler_X = StandardScaler()
         self.scaler_y = StandardScaler()
         self.feature_names = None
+        # Scaler parameters in prediction form, set by _cache_scaling
+        self._x_inv_scale = None
+        self._x_shift = None
+        self._y_mean = 0.0
+        self._y_scale = 1.0
         self.model_path = f'backend/trained_models/model_{model_type}'
         self.scaler_path = f'backend/trained_models/scalers_{model_type}.pkl'
     
+    def _create_model(self, **model_kwargs) -> BaseHousingModel:
+        """
+        Instantiate the framework model for this wrapper's model type
+        
+        Frameworks are imported here instead of at module level so processes
+        that never train or predict (e.g. the gevent Celery fleet) don't load
+        TensorFlow or PyTorch.
+        """
+        if self.model_type == 'tensorflow':
+            from models.tensorflow_model import TensorFlowModel
+            return TensorFlowModel(**model_kwargs)
+        elif self.model_type == 'pytorch':
+            from models.pytorch_model import PyTorchModel
+            return PyTorchModel(**model_kwargs)
+        elif self.model_type == 'xgboost':
+            from models.xgboost_model import XGBoostModel
+            return XGBoostModel(**model_kwargs)
+        else:
+            raise ValueError(f"Unknown model type: {self.model_type}")
+    
+    def _cache_scaling(self) -> None:
+        """
+        Keep the fitted scaler parameters ready for predict_batch
+        
+        Feature scaling (x - mean) / scale is folded into the affine form
+        x * inv_scale + shift (float32 vectors), so prediction scales with a
+        multiply and an add instead of going through StandardScaler; the
+        target mean/scale are kept as floats for the inverse.
+        """
+        inv_scale = 1.0 / self.scaler_X.scale_
+        self._x_inv_scale = inv_scale.astype(np.float32)
+        self._x_shift = (-self.scaler_X.mean_ * inv_scale).astype(np.float32)
+        self._y_mean = float(self.scaler_y.mean_[0])
+        self._y_scale = float(self.scaler_y.scale_[0])
+    
     def load_data(self):
         """Load and preprocess California housing dataset"""
-        print("Loading California housing dataset...")
-        housing = fetch_california_housing()
-        X = housing.data
-        y = housing.target.reshape(-1, 1)
-        self.feature_names = housing.feature_names
+        logger.debug("Loading California housing dataset...")
+        X, y, feature_names = _load_california_housing()
+        self.feature_names = list(feature_names)
         
-        print(f"Dataset loaded: {X.shape[0]} samples, {X.shape[1]} features")
-        print(f"Features: {', '.join(self.feature_names)}")
+        logger.debug("Dataset loaded: %d samples, %d features", X.shape[0], X.shape[1])
+        logger.debug("Features: %s", ', '.join(self.feature_names))
         
         return X, y
     
     def preprocess_data(self, X, y):
         """Normalize features and split into train/test sets"""
+        # Scalers are fitted once per dataset; this model gets its own copies to save
+        key = _dataset_key(X, y)
+        scalers = _SCALER_CACHE.get(key)
+        if scalers is None:
+            scalers = (StandardScaler().fit(X), StandardScaler().fit(y))
+            _SCALER_CACHE[key] = scalers
+        self.scaler_X, self.scaler_y = copy.deepcopy(scalers)
+        
+        self._cache_scaling()
+        
         # Normalize features
-        X_scaled = self.scaler_X.fit_transform(X)
-        y_scaled = self.scaler_y.fit_transform(y)
+        X_scaled = self.scaler_X.transform(X)
+        y_scaled = self.scaler_y.transform(y)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X_scaled, y_scaled, test_size=0.2, random_state=42
         )
         
-        print(f"Training set: {X_train.shape[0]} samples")
-        print(f"Test set: {X_test.shape[0]} samples")
+        logger.debug("Training set: %d samples", X_train.shape[0])
+        logger.debug("Test set: %d samples", X_test.shape[0])
         
         return X_train, X_test, y_train, y_test
     
-    def train_model(self, epochs=500, learning_rate=0.001, hidden_sizes=[64, 32, 16]):
+    def train_model(self, epochs=500, learning_rate=0.001, hidden_sizes=None,
+                    progress_cb=None, save=True, threads=None):
         """
         Train the neural network model
         
         Args:
             epochs: Number of training epochs
             learning_rate: Learning rate for optimizer
-            hidden_sizes: Hidden layer sizes
+            hidden_sizes: Hidden layer sizes (None for DEFAULT_HIDDEN_SIZES)
+            progress_cb: Optional callback called as progress_cb(epoch, epochs)
+            save: Save the model and scalers to disk; pass False to call
+                save_model() separately (e.g. after the response is sent)
+            threads: Cap on the framework threads used for training, for
+                models trained concurrently in one process (None: no cap)
             
         Returns:
             Dictionary with training metrics
         """
+        if hidden_sizes is None:
+            hidden_sizes = list(DEFAULT_HIDDEN_SIZES)
+        
         # Load and preprocess data
         X, y = self.load_data()
         X_train, X_test, y_train, y_test = self.preprocess_data(X, y)
@@ -84,70 +183,48 @@ class HousePriceModel:
         input_size = X_train.shape[1]
         output_size = 1
         
-        print(f"\n{'='*70}")
-        print(f"Initializing {self.model_type.upper()} Neural Network...")
-        print(f"Architecture: {input_size} -> {' -> '.join(map(str, hidden_sizes))} -> {output_size}")
-        print(f"{'='*70}\n")
+        logger.debug("Initializing %s model...", self.model_type.upper())
+        logger.debug("Architecture: %s -> %s -> %s",
+                     input_size, ' -> '.join(map(str, hidden_sizes)), output_size)
         
-        if self.model_type == 'tensorflow':
-            self.model = TensorFlowModel(
-                input_size=input_size,
-                hidden_sizes=hidden_sizes,
-                output_size=output_size,
-                learning_rate=learning_rate
-            )
-        elif self.model_type == 'pytorch':
-            self.model = PyTorchModel(
-                input_size=input_size,
-                hidden_sizes=hidden_sizes,
-                output_size=output_size,
-                learning_rate=learning_rate
-            )
-        elif self.model_type == 'xgboost':
-            self.model = XGBoostModel(
-                input_size=input_size,
-                hidden_sizes=hidden_sizes,
-                output_size=output_size,
-                learning_rate=learning_rate
-            )
-        else:
-            raise ValueError(f"Unknown model type: {self.model_type}")
+        self.model = self._create_model(
+            input_size=input_size,
+            hidden_sizes=hidden_sizes,
+            output_size=output_size,
+            learning_rate=learning_rate
+        )
         
-        # Display model architecture
-        print("Model Architecture:")
-        self.model.summary()
+        # Display model architecture (summary() prints, so only when debugging)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Model architecture:")
+            self.model.summary()
         
         # Train model
-        print(f"\nTraining model for {epochs} epochs...")
-        losses = self.model.train(X_train, y_train, epochs=epochs, batch_size=32, verbose=True)
+        logger.debug("Training model for %d epochs...", epochs)
+        with self.model.thread_limit(threads):
+            losses = self.model.train(X_train, y_train, epochs=epochs, batch_size=32, verbose=True,
+                                      progress_cb=progress_cb)
         
         # Evaluate model
-        print("\nEvaluating model...")
+        logger.debug("Evaluating model...")
         train_pred = self.model.predict(X_train)
         test_pred = self.model.predict(X_test)
         
         train_r2 = calculate_r2_score(y_train, train_pred)
         test_r2 = calculate_r2_score(y_test, test_pred)
         
-        # Convert back to original scale for interpretability
-        train_pred_original = self.scaler_y.inverse_transform(train_pred)
-        test_pred_original = self.scaler_y.inverse_transform(test_pred)
-        y_train_original = self.scaler_y.inverse_transform(y_train)
-        y_test_original = self.scaler_y.inverse_transform(y_test)
-        
-        train_mse = np.mean((y_train_original - train_pred_original) ** 2)
-        test_mse = np.mean((y_test_original - test_pred_original) ** 2)
+        # MSE on the original scale: the target scaler is affine (y = z * scale + mean),
+        # so the error only needs multiplying by scale^2 instead of inverse-transforming
+        scale_sq = float(self.scaler_y.scale_[0]) ** 2
+        train_mse = np.mean((y_train - train_pred) ** 2) * scale_sq
+        test_mse = np.mean((y_test - test_pred) ** 2) * scale_sq
         train_rmse = np.sqrt(train_mse)
         test_rmse = np.sqrt(test_mse)
         
-        print(f"\n{'='*70}")
-        print(f"Training Results ({self.model_type.upper()}):")
-        print(f"{'='*70}")
-        print(f"  Train R² Score: {train_r2:.4f}")
-        print(f"  Test R² Score: {test_r2:.4f}")
-        print(f"  Train RMSE: ${train_rmse * 100000:.2f}")
-        print(f"  Test RMSE: ${test_rmse * 100000:.2f}")
-        print(f"{'='*70}\n")
+        logger.debug(
+            "Training results (%s): train R² %.4f, test R² %.4f, train RMSE $%.2f, test RMSE $%.2f",
+            self.model_type.upper(), train_r2, test_r2, train_rmse * 100000, test_rmse * 100000
+        )
         
         # Store metrics in model
         self.model.metrics = {
@@ -158,10 +235,17 @@ class HousePriceModel:
         }
         
         # Save model
-        self.save_model()
+        if save:
+            self.save_model()
+        
+        # Loss history as packed float32 bytes: ~4x smaller than a JSON float
+        # list and no per-element encoding (decode with np.frombuffer)
+        losses_arr = np.asarray(losses, dtype=np.float32)
         
         return {
-            'losses': losses,
+            'losses_b64': base64.b64encode(losses_arr.tobytes()).decode('ascii'),
+            'losses_len': len(losses_arr),
+            'losses_dtype': 'float32',
             'train_r2': float(train_r2),
             'test_r2': float(test_r2),
             'train_rmse': float(train_rmse),
@@ -185,17 +269,19 @@ class HousePriceModel:
                 'scaler_y': self.scaler_y,
                 'feature_names': self.feature_names,
                 'model_type': self.model_type
-            }, f)
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
         
-        print(f"\nModel saved to {self.model_path}")
-        print(f"Scalers saved to {self.scaler_path}")
+        logger.debug("Model saved to %s", self.model_path)
+        logger.debug("Scalers saved to %s", self.scaler_path)
     
     def load_model(self):
         """Load model and scalers from disk"""
         # Check if files exist
-        model_file = f"{self.model_path}.keras" if self.model_type == 'tensorflow' else f"{self.model_path}.pt"
+        model_exists = any(
+            os.path.exists(f"{self.model_path}{ext}") for ext in MODEL_FILE_EXTENSIONS[self.model_type]
+        )
         
-        if not os.path.exists(model_file) or not os.path.exists(self.scaler_path):
+        if not model_exists or not os.path.exists(self.scaler_path):
             raise FileNotFoundError(f"Model files not found for {self.model_type}. Please train the model first.")
         
         # Load scalers
@@ -204,66 +290,102 @@ class HousePriceModel:
             self.scaler_X = scaler_data['scaler_X']
             self.scaler_y = scaler_data['scaler_y']
             self.feature_names = scaler_data['feature_names']
+        self._cache_scaling()
         
         # Initialize and load model
         input_size = self.scaler_X.n_features_in_
         hidden_sizes = [64, 32, 16]
         
-        if self.model_type == 'tensorflow':
-            self.model = TensorFlowModel(input_size=input_size, hidden_sizes=hidden_sizes, output_size=1)
-        elif self.model_type == 'pytorch':
-            self.model = PyTorchModel(input_size=input_size, hidden_sizes=hidden_sizes, output_size=1)
-        elif self.model_type == 'xgboost':
-            self.model = XGBoostModel(input_size=input_size, hidden_sizes=hidden_sizes, output_size=1)
-        
+        self.model = self._create_model(input_size=input_size, hidden_sizes=hidden_sizes, output_size=1)
         self.model.load(self.model_path)
         
-        print(f"{self.model_type.upper()} model loaded successfully")
+        logger.debug("%s model loaded successfully", self.model_type.upper())
     
     def predict(self, features):
         """
         Make prediction for given house features
         
         Args:
-            features: Dictionary with feature names and values or numpy array
+            features: Dictionary with feature names and values, or numpy
+                feature vector in FEATURE_ORDER
         
         Returns:
             Predicted house price
         """
+        if isinstance(features, dict):
+            features = [features]
+        
+        return float(self.predict_batch(features)[0])
+    
+    def predict_batch(self, features):
+        """
+        Make predictions for several houses with a single model call
+        
+        Args:
+            features: numpy array with one row per house (FEATURE_ORDER columns),
+                or a list of feature vectors or feature dictionaries
+        
+        Returns:
+            1D numpy array of predicted house prices
+        """
         if self.model is None:
             self.load_model()
         
-        # Convert dictionary to array if needed
-        if isinstance(features, dict):
-            feature_array = np.array([[
-                features.get('MedInc', 3.0),
-                features.get('HouseAge', 25.0),
-                features.get('AveRooms', 5.0),
-                features.get('AveBedrms', 1.0),
-                features.get('Population', 1500.0),
-                features.get('AveOccup', 3.0),
-                features.get('Latitude', 35.0),
-                features.get('Longitude', -120.0)
-            ]])
-        else:
+        # Convert to a 2D array if needed
+        if isinstance(features, np.ndarray):
             feature_array = features.reshape(1, -1) if features.ndim == 1 else features
+        elif features and isinstance(features[0], np.ndarray):
+            feature_array = np.vstack(features)
+        else:
+            feature_array = np.array([
+                [f.get(name, FEATURE_DEFAULTS[name]) for name in FEATURE_ORDER]
+                for f in features
+            ])
         
-        # Scale features
-        features_scaled = self.scaler_X.transform(feature_array)
+        # Scale features into one new float32 buffer (the input may be shared
+        # between models, so it is never modified); the model's own float32
+        # conversion is then a no-op
+        features_scaled = np.multiply(feature_array, self._x_inv_scale, dtype=np.float32)
+        np.add(features_scaled, self._x_shift, out=features_scaled)
         
         # Predict
         prediction_scaled = self.model.predict(features_scaled)
         
-        # Inverse transform to get actual price
-        prediction = self.scaler_y.inverse_transform(prediction_scaled)
-        
-        return float(prediction[0][0])
+        # Inverse transform to get actual price (in float64, so cents stay exact)
+        return np.multiply(prediction_scaled.ravel(), self._y_scale, dtype=np.float64) + self._y_mean
+
+
+def _train_one(model_type, epochs, learning_rate, cpus=None, log_level=logging.WARNING):
+    """
+    Train and save one model type in a train_all_models worker process
+    
+    Args:
+        model_type: Model type to train
+        epochs: Number of training epochs
+        learning_rate: Learning rate
+        cpus: CPU ids to pin this process to (Linux only), so the models
+            don't oversubscribe each other's cores
+        log_level: Log level of the parent process
+    
+    Returns:
+        Training metrics
+    """
+    logging.basicConfig(level=log_level, format='%(message)s')
+    # Pinned before the framework is imported, so its thread pools see the mask
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    
+    logger.debug("Training %s model", model_type.upper())
+    return HousePriceModel(model_type=model_type).train_model(epochs=epochs, learning_rate=learning_rate)
 
 
 def train_all_models(epochs=500, learning_rate=0.001):
     """
     Train all three model types for comparison
     
+    The models are independent, so each trains in its own process (on its
+    own share of the CPUs where supported); wall time is that of the slowest.
+    
     Args:
         epochs: Number of training epochs
         learning_rate: Learning rate
@@ -271,29 +393,32 @@ def train_all_models(epochs=500, learning_rate=0.001):
     Returns:
         Dictionary with metrics for all models
     """
-    results = {}
+    model_types = ['tensorflow', 'pytorch', 'xgboost']
     
-    for model_type in ['tensorflow', 'pytorch', 'xgboost']:
-        print(f"\n\n{'#'*70}")
-        print(f"# Training {model_type.upper()} Model")
-        print(f"{'#'*70}\n")
-        
-        model = HousePriceModel(model_type=model_type)
-        metrics = model.train_model(epochs=epochs, learning_rate=learning_rate)
-        results[model_type] = metrics
+    # Disjoint CPU sets, one per model
+    cpu_sets = [None] * len(model_types)
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = sorted(os.sched_getaffinity(0))
+        if len(cpus) >= len(model_types):
+            cpu_sets = [set(cpus[i::len(model_types)]) for i in range(len(model_types))]
     
-    # Print comparison
-    print(f"\n\n{'='*70}")
-    print("MODEL COMPARISON SUMMARY")
-    print(f"{'='*70}")
-    print(f"{'Model':<20} {'Test R²':<12} {'Test RMSE':<15} {'Final Loss':<12}")
-    print(f"{'-'*70}")
+    # spawn: children must not inherit framework/CUDA state from the parent
+    with ProcessPoolExecutor(max_workers=len(model_types),
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {
+            model_type: pool.submit(_train_one, model_type, epochs, learning_rate,
+                                    cpu_set, logging.getLogger().getEffectiveLevel())
+            for model_type, cpu_set in zip(model_types, cpu_sets)
+        }
+        results = {model_type: future.result() for model_type, future in futures.items()}
     
-    for model_type, metrics in results.items():
-        print(f"{model_type.upper():<20} {metrics['test_r2']:<12.4f} "
-              f"${metrics['test_rmse']*100000:<14,.2f} {metrics['final_loss']:<12.6f}")
+    # Log comparison
+    logger.debug("Model comparison summary")
+    logger.debug("%-20s %-12s %-15s %-12s", 'Model', 'Test R²', 'Test RMSE', 'Final Loss')
     
-    print(f"{'='*70}\n")
+    for model_type, metrics in results.items():
+        logger.debug("%-20s %-12.4f $%-14s %-12.6f", model_type.upper(), metrics['test_r2'],
+                     f"{metrics['test_rmse']*100000:,.2f}", metrics['final_loss'])
     
     return results
 
@@ -301,6 +426,9 @@ def train_all_models(epochs=500, learning_rate=0.001):
 if __name__ == "__main__":
     import sys
     
+    # Show the training details on the command line
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+    
     # Check if specific model type is requested
     if len(sys.argv) > 1:
         model_type = sys.argv[1].lower()
@@ -181,11 +181,11 @@ def test_model_characteristics():
         assert model_type in characteristics, f"{model_type} missing from characteristics"
         
         char = characteristics[model_type]
-        assert 'name' in char, f"{model_type} missing 'name'"
-        assert 'architecture' in char, f"{model_type} missing 'architecture'"
-        assert 'strengths' in char, f"{model_type} missing 'strengths'"
+        assert char.name, f"{model_type} missing 'name'"
+        assert char.architecture, f"{model_type} missing 'architecture'"
+        assert char.strengths, f"{model_type} missing 'strengths'"
         
-        print(f"✓ {model_type}: {char['name']}")
+        print(f"✓ {model_type}: {char.name}")
     
     print("✓ All characteristics present")
     print("✓ Model characteristics test PASSED\n")
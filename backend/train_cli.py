@@ -8,8 +8,12 @@ from services.training_service import HousePriceModel, train_all_models
 __all__ = ['HousePriceModel', 'train_all_models']
 
 if __name__ == "__main__":
+    import logging
     import sys
     
+    # Show the training details on the command line
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+    
     # Check if specific model type is requested
     if len(sys.argv) > 1:
         model_type = sys.argv[1].lower()